@@ -0,0 +1,199 @@
+# --- Banco de pruebas sin cámara ni ventana para el teclado virtual ---
+# Ejecuta la lógica de cada frame (seguimiento, detección de tecla, clic y
+# autocompletado) sin interfaz, con pygame sustituido y las pulsaciones enviadas por la
+# misma cola de salida que el teclado real, pero a un registro en lugar de pyautogui.
+# Informa frames por segundo, tiempo por etapa y el texto producido.
+#
+#   python benchmark.py --video grabacion.mp4 --grabar-marcas marcas.jsonl
+#   python benchmark.py --marcas marcas.jsonl
+#   python benchmark.py --sintetico "hola mundo" --esperado "hola mundo"
+#
+# En el modo sintético '<' pulsa BORRAR y '>' pulsa COMPLETAR.
+# El tiempo de cada frame es simulado (frame / fps), así el resultado no depende
+# de la velocidad de la máquina y se puede comprobar en CI.
+import argparse          # Biblioteca para leer argumentos de línea de comandos
+import json              # Biblioteca para leer y escribir marcas en JSONL
+import sys               # Biblioteca para el código de salida
+import time              # Biblioteca para medir tiempos
+from collections import namedtuple
+import numpy as np       # Biblioteca para crear frames vacíos
+import cv2               # Biblioteca para procesamiento de imágenes y video
+import teclado           # Configuración y lógica por frame del teclado virtual
+from vocabulario import cargar_vocabulario
+from metricas import Instrumentacion
+from salida import ColaTeclas
+
+# --- Estructuras con la misma forma que los resultados de MediaPipe Hands ---
+Punto = namedtuple("Punto", "x y z")
+Mano = namedtuple("Mano", "landmark")
+Resultado = namedtuple("Resultado", "multi_hand_landmarks")
+
+
+# --- Emisor que solo registra las pulsaciones en lugar de enviarlas al sistema ---
+# Recibe las llamadas ya agrupadas por ColaTeclas, igual que EmisorPyautogui
+class SalidaRegistro:
+    def __init__(self):
+        self.eventos = []
+        self.texto = ""      # Texto que vería el sistema aplicando los eventos
+
+    def escribir(self, texto):
+        self.eventos.append(("escribir", texto))
+        self.texto += texto
+
+    def borrar(self, n=1):
+        self.eventos.append(("borrar", n))
+        self.texto = self.texto[:-n] if n < len(self.texto) else ""
+
+
+# --- Convertir marcas guardadas ([[x, y, z], ...] por mano) en un resultado ---
+def resultado_desde_lista(manos):
+    if not manos:
+        return Resultado(None)
+    return Resultado([Mano([Punto(*p) for p in mano]) for mano in manos])
+
+
+# --- Frames desde un video: se procesan con MediaPipe como en la cámara ---
+# Devuelve (imagen, resultado); opcionalmente guarda las marcas en JSONL para reproducirlas
+def frames_video(path, inst, usar_roi, grabar=None):
+    import mediapipe as mp
+    from seguimiento import SeguidorMano
+    hands = mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.8)
+    hands_deteccion = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.8)
+    seguidor = SeguidorMano(hands_deteccion, hands, escala_deteccion=0.5, instrumentacion=inst)
+    cap = cv2.VideoCapture(path)
+    destino = open(grabar, "w", encoding="utf-8") if grabar else None
+    try:
+        while True:
+            with inst.etapa("captura"):
+                success, img = cap.read()
+            if not success:
+                break
+            with inst.etapa("voltear"):
+                img = cv2.flip(img, 1)
+            if usar_roi:
+                result = seguidor.procesar(img)
+            else:
+                with inst.etapa("hands"):
+                    result = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            if destino:
+                manos = [[[lm.x, lm.y, lm.z] for lm in mano.landmark]
+                         for mano in (result.multi_hand_landmarks or [])]
+                destino.write(json.dumps({"manos": manos}) + "\n")
+            yield img, result
+    finally:
+        cap.release()
+        if destino:
+            destino.close()
+
+
+# --- Frames desde un archivo JSONL de marcas: {"manos": [[[x, y, z] x 21], ...]} por línea ---
+def frames_marcas(path, ancho, alto):
+    with open(path, encoding="utf-8") as f:
+        for linea in f:
+            if linea.strip():
+                yield np.zeros((alto, ancho, 3), np.uint8), resultado_desde_lista(json.loads(linea).get("manos"))
+
+
+# --- Generar una mano sintética con el índice en (x, y) y el pulgar a cierta distancia ---
+def mano_sintetica(x, y, separacion, ancho, alto):
+    puntos = [(x + 40, y + 150)] * 21               # Resto de la mano por debajo del dedo
+    puntos[4] = (x + separacion, y)                 # Punta del pulgar
+    puntos[8] = (x, y)                              # Punta del dedo índice
+    return [[px / ancho, py / alto, 0.0] for px, py in puntos]
+
+
+# --- Trayectorias sintéticas del dedo que escriben un texto ---
+# Para cada carácter el dedo se mueve hasta el centro de la tecla, junta el pulgar
+# (clic) y lo separa antes de ir a la siguiente
+def frames_sinteticos(texto, capa, ancho, alto, frames_mov=8, frames_clic=3, frames_suelta=6):
+    capa.componer(np.zeros((alto, ancho, 3), np.uint8))   # Construir posiciones de las teclas
+    centros = {k: (x + capa.key_w // 2, y + capa.key_h // 2) for k, x, y in capa.key_positions}
+    especiales = {" ": "ESPACIO", "<": "BORRAR", ">": "COMPLETAR"}
+    x, y = ancho // 2, alto - 150
+    for caracter in texto:
+        tecla = especiales.get(caracter, caracter.upper())
+        if tecla not in centros:
+            raise ValueError(f"No hay tecla para el carácter {caracter!r}")
+        tx, ty = centros[tecla]
+        for i in range(1, frames_mov + 1):
+            px, py = x + (tx - x) * i // frames_mov, y + (ty - y) * i // frames_mov
+            yield np.zeros((alto, ancho, 3), np.uint8), resultado_desde_lista([mano_sintetica(px, py, 100, ancho, alto)])
+        for separacion in [20] * frames_clic + [100] * frames_suelta:
+            yield np.zeros((alto, ancho, 3), np.uint8), resultado_desde_lista([mano_sintetica(tx, ty, separacion, ancho, alto)])
+        x, y = tx, ty
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco de pruebas sin cámara del teclado virtual")
+    fuente = parser.add_mutually_exclusive_group(required=True)
+    fuente.add_argument("--video", help="Video grabado que se procesa con MediaPipe")
+    fuente.add_argument("--marcas", help="Archivo JSONL con las marcas de la mano por frame")
+    fuente.add_argument("--sintetico", help="Texto a escribir con trayectorias sintéticas del dedo")
+    parser.add_argument("--grabar-marcas", help="En modo video, guardar las marcas en este JSONL")
+    parser.add_argument("--sin-roi", action="store_true", help="En modo video, procesar siempre el frame completo")
+    parser.add_argument("--sin-modelo", action="store_true", help="Autocompletar solo con el vocabulario")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frames por segundo simulados")
+    parser.add_argument("--esperado", help="Texto esperado; si no coincide el código de salida es 1")
+    parser.add_argument("--json", action="store_true", help="Imprimir el informe en JSON")
+    args = parser.parse_args()
+
+    ancho, alto = teclado.w, teclado.h
+    completador = None if args.sin_modelo else teclado.cargar_completador()
+    # La ventana de percentiles cubre toda la ejecución
+    inst = Instrumentacion(tam_ventana=100000)
+    # Las pulsaciones pasan por la cola de salida real (hilo y agrupación) hasta el registro
+    registro = SalidaRegistro()
+    salida = ColaTeclas(emisor=registro, instrumentacion=inst)
+    virtual = teclado.TecladoVirtual(cargar_vocabulario(), completador, salida, instrumentacion=inst)
+
+    if args.video:
+        frames = frames_video(args.video, inst, not args.sin_roi, args.grabar_marcas)
+    elif args.marcas:
+        frames = frames_marcas(args.marcas, ancho, alto)
+    else:
+        frames = frames_sinteticos(args.sintetico, virtual.capa_teclado, ancho, alto)
+
+    # --- Procesar todos los frames midiendo el tiempo total ---
+    n = 0
+    inicio = time.perf_counter()
+    for img, result in frames:
+        virtual.procesar_frame(img, result, n / args.fps)
+        n += 1
+    duracion = time.perf_counter() - inicio
+    # Esperar a que el hilo de salida envíe todo antes de comparar lo que recibió el sistema
+    salida.vaciar()
+    salida.detener()
+    etapas = inst.resumen()
+
+    informe = {
+        "frames": n,
+        "segundos": round(duracion, 4),
+        "fps": round(n / duracion, 1) if duracion else 0.0,
+        "etapas": etapas,
+        "pulsaciones": registro.eventos,
+        "salida": salida.contadores(),
+        "texto": virtual.texto_escrito,
+    }
+    if args.json:
+        print(json.dumps(informe, ensure_ascii=False))
+    else:
+        print(f"Frames:        {informe['frames']}")
+        print(f"Tiempo:        {informe['segundos']:.3f} s ({informe['fps']} fps)")
+        print(f"  {'etapa':<14} {'media':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+        for etapa, d in etapas.items():
+            print(f"  {etapa:<14} {d['media_ms']:8.3f} {d['p50_ms']:8.3f} {d['p95_ms']:8.3f} {d['p99_ms']:8.3f}")
+        print(f"Pulsaciones:   {len(registro.eventos)} llamadas para {salida.operaciones} operaciones")
+        print(f"Texto:         {informe['texto']!r}")
+
+    # El texto que recibe el sistema debe coincidir con el que muestra el teclado
+    if registro.texto != virtual.texto_escrito:
+        print(f"Texto enviado {registro.texto!r} distinto del mostrado {virtual.texto_escrito!r}")
+        return 1
+    if args.esperado is not None and virtual.texto_escrito != args.esperado:
+        print(f"Texto esperado {args.esperado!r}, obtenido {virtual.texto_escrito!r}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import cv2               # Biblioteca para procesamiento de imágenes y video
+import numpy as np       # Biblioteca para operaciones vectorizadas sobre imágenes
+
+
+# --- Capa pre-renderizada del teclado virtual ---
+# El teclado es estático, así que se dibuja una sola vez en una imagen propia
+# junto con una máscara; en cada frame solo se copia sobre la imagen de la cámara.
+# También se precalcula una rejilla que asigna a cada píxel el índice de su tecla
+class CapaTeclado:
+    def __init__(self, keys, key_w, key_h, start_x, start_y, x_spacing, y_spacing):
+        self.keys = keys
+        self.key_w, self.key_h = key_w, key_h
+        self.start_x, self.start_y = start_x, start_y
+        self.x_spacing, self.y_spacing = x_spacing, y_spacing
+        self.forma = None            # (alto, ancho) del frame para el que se construyó la capa
+        self.key_positions = []      # Lista de (tecla, x, y) igual que en draw_keyboard
+
+    # --- Cambiar la distribución del teclado y forzar su reconstrucción ---
+    def actualizar_layout(self, keys=None, **geometria):
+        if keys is not None:
+            self.keys = keys
+        for nombre, valor in geometria.items():
+            setattr(self, nombre, valor)
+        self.forma = None
+
+    # --- Dibujar el teclado y construir máscara y rejilla de colisiones ---
+    def _construir(self, alto, ancho):
+        self.key_positions = []
+        y = self.start_y
+        for row in self.keys:
+            x = self.start_x
+            for key in row:
+                self.key_positions.append((key, x, y))
+                x += self.key_w + self.x_spacing
+            y += self.key_h + self.y_spacing
+        self.indices = {tecla: i for i, tecla in enumerate(self.key_positions)}
+
+        # Capa normal, máscara de píxeles dibujados y versión resaltada de cada tecla
+        self.capa = np.zeros((alto, ancho, 3), np.uint8)
+        self.resaltadas = []
+        mascara = np.zeros((alto, ancho), np.uint8)
+        # Rejilla de índice de tecla por píxel (-1 donde no hay tecla)
+        self.rejilla = np.full((alto, ancho), -1, np.int16)
+
+        for i, (key, x, y) in enumerate(self.key_positions):
+            # Dibujar rectángulo relleno para tecla
+            cv2.rectangle(self.capa, (x, y), (x + self.key_w, y + self.key_h), (200, 200, 200), -1)
+            # Dibujar borde negro
+            cv2.rectangle(self.capa, (x, y), (x + self.key_w, y + self.key_h), (0, 0, 0), 2)
+            cv2.rectangle(mascara, (x, y), (x + self.key_w, y + self.key_h), 255, -1)
+            cv2.rectangle(mascara, (x, y), (x + self.key_w, y + self.key_h), 255, 2)
+
+            # Ajustar tamaño de texto según longitud de tecla (una letra o palabra)
+            font_scale = 1.2 if len(key) == 1 else 0.8
+            text_size = cv2.getTextSize(key, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)[0]
+            text_x = x + (self.key_w - text_size[0]) // 2
+            text_y = y + (self.key_h + text_size[1]) // 2
+            cv2.putText(self.capa, key, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), 2)
+            # Los textos largos (ESPACIO, COMPLETAR) se salen del rectángulo y también van en la máscara
+            cv2.putText(mascara, key, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, 255, 2)
+
+            self.resaltadas.append(self._construir_resaltada(key, x, y, alto, ancho))
+
+            # El interior estricto de la tecla (x < px < x + key_w) pertenece a la tecla i
+            self.rejilla[max(y + 1, 0):y + self.key_h, max(x + 1, 0):x + self.key_w] = i
+
+        # Recortar al rectángulo que contiene el teclado para copiar menos píxeles
+        ys, xs = np.nonzero(mascara)
+        if len(ys):
+            self.region = (slice(ys.min(), ys.max() + 1), slice(xs.min(), xs.max() + 1))
+        else:
+            self.region = (slice(0, 0), slice(0, 0))
+        self.mascara = mascara[self.region]
+        self.forma = (alto, ancho)
+
+    # --- Dibujar la versión resaltada (verde con texto blanco) de una tecla ---
+    # El texto puede salirse del rectángulo, así que se guarda un recorte que
+    # cubre rectángulo y texto, con su propia máscara
+    def _construir_resaltada(self, key, x, y, alto, ancho):
+        (tw, th), base = cv2.getTextSize(key, cv2.FONT_HERSHEY_SIMPLEX, 1.5, 2)
+        x0 = max(min(x, x + 25) - 2, 0)
+        y0 = max(min(y, y + 65 - th) - 2, 0)
+        x1 = min(max(x + self.key_w, x + 25 + tw) + 3, ancho)
+        y1 = min(max(y + self.key_h, y + 65 + base) + 3, alto)
+        recorte = np.zeros((max(y1 - y0, 0), max(x1 - x0, 0), 3), np.uint8)
+        mascara = np.zeros(recorte.shape[:2], np.uint8)
+        for lienzo, verde, blanco in ((recorte, (0, 255, 0), (255, 255, 255)), (mascara, 255, 255)):
+            cv2.rectangle(lienzo, (x - x0, y - y0), (x - x0 + self.key_w, y - y0 + self.key_h), verde, -1)
+            cv2.putText(lienzo, key, (x - x0 + 25, y - y0 + 65), cv2.FONT_HERSHEY_SIMPLEX, 1.5, blanco, 2)
+        return (slice(y0, y1), slice(x0, x1)), recorte, mascara
+
+    # --- Componer el teclado sobre el frame en una sola operación vectorizada ---
+    # cv2.copyTo escribe directamente sobre la vista del frame usando la máscara
+    def componer(self, img):
+        if self.forma != img.shape[:2]:
+            self._construir(*img.shape[:2])
+        cv2.copyTo(self.capa[self.region], self.mascara, img[self.region])
+        return self.key_positions
+
+    # --- Obtener la tecla bajo un punto en tiempo constante ---
+    # Devuelve (tecla, x, y) o None si el punto no está sobre ninguna tecla
+    def tecla_en(self, punto):
+        px, py = punto
+        if self.forma is None or not (0 <= py < self.forma[0] and 0 <= px < self.forma[1]):
+            return None
+        i = self.rejilla[py, px]
+        if i < 0:
+            return None
+        return self.key_positions[i]
+
+    # --- Copiar la versión resaltada de una tecla sobre el frame ---
+    def resaltar(self, img, tecla):
+        zona, recorte, mascara = self.resaltadas[self.indices[tecla]]
+        cv2.copyTo(recorte, mascara, img[zona])
@@ -0,0 +1,92 @@
+# --- Generador de carga para el servidor de autocompletado ---
+# Levanta el servidor dentro del mismo proceso en un puerto libre y simula varios
+# teclados escribiendo palabras carácter a carácter. Informa el rendimiento
+# (peticiones por segundo), la latencia p50/p99 y el tamaño medio de los lotes.
+#
+#   python carga_prueba.py --clientes 64 --simulado     # Modelo simulado con costo fijo por lote
+#   python carga_prueba.py --clientes 64                # Modelo LSTM real
+import argparse          # Biblioteca para leer argumentos de línea de comandos
+import asyncio           # Biblioteca para clientes y servidor asíncronos
+import json              # Biblioteca para el protocolo de mensajes
+import random            # Biblioteca para elegir palabras al azar
+import time              # Biblioteca para medir tiempos
+from server import PredictorLSTM, cargar, iniciar_servidor
+from vocabulario import cargar_vocabulario
+from metricas import percentil
+
+
+# --- Sustituto del modelo con un costo fijo por lote más un costo por petición ---
+# Sirve para medir el servidor sin depender del modelo: el costo fijo por lote es
+# lo que el micro-batching reparte entre las peticiones agrupadas
+class PredictorSimulado:
+    def __init__(self, costo_lote=0.002, costo_peticion=0.00005):
+        self.costo_lote = costo_lote
+        self.costo_peticion = costo_peticion
+
+    def procesar_lote(self, peticiones):
+        time.sleep(self.costo_lote + self.costo_peticion * len(peticiones))
+        return [p["texto"][-1:] if p["tipo"] == "siguiente" else [[p["texto"], 0.0]] for p in peticiones]
+
+
+# --- Un cliente que escribe palabras y pide una predicción por cada carácter ---
+async def cliente(port, palabras, peticiones, tipo, latencias, errores):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    enviadas = 0
+    while enviadas < peticiones:
+        palabra = random.choice(palabras)
+        for i in range(1, len(palabra) + 1):
+            if enviadas >= peticiones:
+                break
+            inicio = time.perf_counter()
+            mensaje = {"id": enviadas, "tipo": tipo, "texto": palabra[:i]}
+            writer.write((json.dumps(mensaje, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+            respuesta = json.loads(await reader.readline())
+            latencias.append(time.perf_counter() - inicio)
+            if "error" in respuesta:
+                errores.append(respuesta["error"])
+            enviadas += 1
+    writer.close()
+    await writer.wait_closed()
+
+
+async def principal(args):
+    predictor = PredictorSimulado() if args.simulado else PredictorLSTM(*cargar())
+    servidor, loteador = await iniciar_servidor(predictor, "127.0.0.1", 0, args.max_lote, args.max_espera_ms / 1000)
+    port = servidor.sockets[0].getsockname()[1]
+    palabras = list(cargar_vocabulario().frecuencias) or ["hola"]
+
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(port, palabras, args.peticiones, args.tipo, latencias, errores)
+                           for _ in range(args.clientes)))
+    duracion = time.perf_counter() - inicio
+
+    servidor.close()
+    await servidor.wait_closed()
+    await loteador.detener()
+
+    print(f"Modelo:             {'simulado' if args.simulado else 'LSTM'}")
+    print(f"Clientes:           {args.clientes}")
+    print(f"Peticiones:         {len(latencias)} ({len(errores)} con error)")
+    print(f"Rendimiento:        {len(latencias) / duracion:.1f} peticiones/s")
+    latencias.sort()
+    print(f"Latencia p50:       {percentil(latencias, 50) * 1000:.2f} ms")
+    print(f"Latencia p99:       {percentil(latencias, 99) * 1000:.2f} ms")
+    print(f"Tamaño medio lote:  {loteador.atendidas / max(loteador.lotes, 1):.1f}")
+    if not args.simulado:
+        cache = predictor.completador.contadores()
+        print(f"Caché completar:    {cache['aciertos']} aciertos, {cache['fallos']} fallos "
+              f"({cache['tasa_aciertos']:.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generador de carga para server.py")
+    parser.add_argument("--clientes", type=int, default=32, help="Clientes concurrentes")
+    parser.add_argument("--peticiones", type=int, default=200, help="Peticiones por cliente")
+    parser.add_argument("--tipo", choices=["siguiente", "completar"], default="siguiente")
+    parser.add_argument("--max-lote", type=int, default=32)
+    parser.add_argument("--max-espera-ms", type=float, default=5.0)
+    parser.add_argument("--simulado", action="store_true", help="Usar un modelo simulado en lugar del LSTM")
+    args = parser.parse_args()
+    asyncio.run(principal(args))
@@ -1,75 +1,198 @@
-# Importar bibliotecas necesarias 
+# Importar bibliotecas necesarias
 import os
+import argparse
+import time
 import numpy as np
+import pickle
+
+# --- Opciones de entrenamiento ---
+# Por defecto se entrena como siempre (todo el corpus en memoria). Con --streaming el
+# corpus se lee de forma perezosa y los pares se generan con un pipeline tf.data
+parser = argparse.ArgumentParser(description="Entrenar el modelo LSTM de autocompletado")
+parser.add_argument("--corpus", default="spanish_corpus.txt")
+parser.add_argument("--dir-modelo", default="model", help="Carpeta donde se guardan modelo y mapas")
+parser.add_argument("--epocas", type=int, default=30)
+parser.add_argument("--batch-size", type=int, default=128)
+parser.add_argument("--streaming", action="store_true", help="Entrenar en memoria acotada con tf.data")
+parser.add_argument("--buffer-mezcla", type=int, default=10000, help="Tamaño del buffer de mezcla en modo streaming")
+args = parser.parse_args()
+
+# TensorFlow se importa después de leer los argumentos: tarda varios segundos y así
+# --help o un argumento inválido responden al instante
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Embedding
 from tensorflow.keras.utils import to_categorical
-import pickle
 
-# Crear carpeta 'model' si no existe 
+# Crear carpeta 'model' si no existe
 # Esta carpeta se utilizará para guardar el modelo entrenado y los mapas de caracteres
-if not os.path.exists("model"):
-    os.makedirs("model")
+if not os.path.exists(args.dir_modelo):
+    os.makedirs(args.dir_modelo)
+
+
+# --- Leer el corpus línea a línea sin cargarlo completo en memoria ---
+# Se asume que cada línea del archivo contiene una palabra. Se quita también '\r'
+# como hace splitlines(), así un corpus con fin de línea CRLF da el mismo alfabeto
+def leer_palabras(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        for linea in f:
+            yield linea.rstrip("\r\n")
+
+
+# --- Métrica con la cantidad de ejemplos entrenados en la época (suma de tamaños de lote) ---
+# Keras la reinicia al empezar cada época
+class EjemplosEntrenados(tf.keras.metrics.Metric):
+    def __init__(self, name="ejemplos", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.total = self.add_weight(name="total", shape=(), initializer="zeros")
+
+    def update_state(self, y_true, y_pred, sample_weight=None):
+        self.total.assign_add(tf.cast(tf.shape(y_true)[0], self.total.dtype))
+
+    def result(self):
+        return self.total
+
+
+# --- Callback que informa cuántos ejemplos por segundo se procesan en cada época ---
+# Los ejemplos salen de la métrica 'ejemplos', actualizada con el tamaño de cada lote
+class EjemplosPorSegundo(tf.keras.callbacks.Callback):
+    def on_epoch_begin(self, epoch, logs=None):
+        self.ejemplos = 0
+        self.inicio = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.ejemplos = int((logs or {}).get("ejemplos", self.ejemplos))
+
+    def on_epoch_end(self, epoch, logs=None):
+        duracion = time.perf_counter() - self.inicio
+        ejemplos = self.ejemplos
+        print(f"Época {epoch + 1}: {ejemplos} ejemplos en {duracion:.1f} s "
+              f"({ejemplos / max(duracion, 1e-9):.0f} ejemplos/s)")
+
 
-# --- 1. Cargar palabras desde un corpus en español ---
-# Se asume que cada línea del archivo 'spanish_corpus.txt' contiene una palabra
-with open("spanish_corpus.txt", encoding="utf-8") as f:
-    words = f.read().splitlines()
+if not args.streaming:
+    # --- 1. Cargar palabras desde un corpus en español ---
+    # Se asume que cada línea del archivo 'spanish_corpus.txt' contiene una palabra
+    with open(args.corpus, encoding="utf-8") as f:
+        words = f.read().splitlines()
 
-# --- Crear vocabulario de caracteres únicos ---
-# Se extraen todos los caracteres presentes en las palabras del corpus
-chars = sorted(list(set("".join(words))))  # Lista ordenada de caracteres únicos
+    # --- Crear vocabulario de caracteres únicos ---
+    # Se extraen todos los caracteres presentes en las palabras del corpus
+    chars = sorted(list(set("".join(words))))  # Lista ordenada de caracteres únicos
+else:
+    # --- 1. Primera pasada perezosa: solo caracteres únicos y longitud máxima ---
+    # La memoria depende del alfabeto, no del tamaño del corpus
+    char_set = set()
+    max_word_len = 0
+    for word in leer_palabras(args.corpus):
+        char_set.update(word)
+        max_word_len = max(max_word_len, len(word))
+    chars = sorted(char_set)
 
 # Crear mapas para convertir caracteres a índices y viceversa
 char2idx = {c: i + 1 for i, c in enumerate(chars)}  # Se suma 1 para reservar el índice 0 para padding
 idx2char = {i + 1: c for i, c in enumerate(chars)}
 vocab_size = len(char2idx) + 1  # Se suma 1 por el índice 0 de padding
 
-# --- 2. Crear secuencias de entrada y etiquetas ---
-# Para cada palabra, se crean pares (secuencia parcial, siguiente carácter)
-sequences = []
-next_chars = []
-
-for word in words:
-    for i in range(1, len(word)):
-        seq = word[:i]  # Subcadena desde el inicio hasta el carácter i-1
-        target = word[i]  # Carácter siguiente a la secuencia
-        sequences.append([char2idx[c] for c in seq])  # Convertir secuencia a índices
-        next_chars.append(char2idx[target])  # Índice del carácter objetivo
-
-# --- Padding de las secuencias ---
-# Se rellenan con ceros al inicio para igualar todas las secuencias a la longitud máxima
-maxlen = max(len(seq) for seq in sequences)
-X = tf.keras.preprocessing.sequence.pad_sequences(sequences, maxlen=maxlen)
-
-# --- One-hot encoding de las etiquetas ---
-# Las etiquetas (caracteres objetivo) se convierten a vectores one-hot
-y = to_categorical(next_chars, num_classes=vocab_size)
-
-# --- 3. Definir modelo LSTM para autocompletado de palabras ---
-model = Sequential([
-    Embedding(input_dim=vocab_size, output_dim=64, input_length=maxlen),  # Embedding de caracteres
-    LSTM(128),                                                             # Capa LSTM con 128 unidades
-    Dense(vocab_size, activation='softmax')                               # Capa de salida con softmax
-])
-
-# --- Compilar modelo ---
-# Se usa 'categorical_crossentropy' ya que se trata de un problema de clasificación multiclase
-model.compile(loss='categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
-
-# Mostrar resumen del modelo
-model.summary()
-
-# --- 4. Entrenamiento del modelo ---
-# Entrena el modelo durante 30 épocas con un tamaño de lote de 128
-model.fit(X, y, epochs=30, batch_size=128)
+if not args.streaming:
+    # --- 2. Crear secuencias de entrada y etiquetas ---
+    # Para cada palabra, se crean pares (secuencia parcial, siguiente carácter)
+    sequences = []
+    next_chars = []
+
+    for word in words:
+        for i in range(1, len(word)):
+            seq = word[:i]  # Subcadena desde el inicio hasta el carácter i-1
+            target = word[i]  # Carácter siguiente a la secuencia
+            sequences.append([char2idx[c] for c in seq])  # Convertir secuencia a índices
+            next_chars.append(char2idx[target])  # Índice del carácter objetivo
+
+    # --- Padding de las secuencias ---
+    # Se rellenan con ceros al inicio para igualar todas las secuencias a la longitud máxima
+    maxlen = max(len(seq) for seq in sequences)
+    X = tf.keras.preprocessing.sequence.pad_sequences(sequences, maxlen=maxlen)
+
+    # --- One-hot encoding de las etiquetas ---
+    # Las etiquetas (caracteres objetivo) se convierten a vectores one-hot
+    y = to_categorical(next_chars, num_classes=vocab_size)
+
+    # --- 3. Definir modelo LSTM para autocompletado de palabras ---
+    model = Sequential([
+        Embedding(input_dim=vocab_size, output_dim=64, input_length=maxlen),  # Embedding de caracteres
+        LSTM(128),                                                             # Capa LSTM con 128 unidades
+        Dense(vocab_size, activation='softmax')                               # Capa de salida con softmax
+    ])
+
+    # --- Compilar modelo ---
+    # Se usa 'categorical_crossentropy' ya que se trata de un problema de clasificación multiclase
+    model.compile(loss='categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
+
+    # Mostrar resumen del modelo
+    model.summary()
+
+    # --- 4. Entrenamiento del modelo ---
+    # Entrena el modelo durante 30 épocas con un tamaño de lote de 128
+    model.fit(X, y, epochs=args.epocas, batch_size=args.batch_size)
+else:
+    # --- 2. Pares (prefijo, siguiente carácter) generados con operaciones de TensorFlow ---
+    # Se vuelve a leer el corpus en cada época, así nunca se guardan todos los pares.
+    # Todo el pipeline son operaciones de grafo: tf.data convierte las palabras en
+    # paralelo, sin pasar por Python ni por el GIL
+    maxlen = max(max_word_len - 1, 1)
+    tabla = tf.lookup.StaticHashTable(
+        tf.lookup.KeyValueTensorInitializer(tf.constant(chars), tf.constant([char2idx[c] for c in chars], tf.int32)),
+        default_value=0)
+
+    # Palabra -> índices de sus caracteres ('\r' final quitado como en leer_palabras)
+    def a_indices(linea):
+        linea = tf.strings.regex_replace(linea, "\r$", "")
+        return tabla.lookup(tf.strings.unicode_split(linea, "UTF-8"))
+
+    # Índices de una palabra -> todos sus pares (prefijo, siguiente carácter)
+    def pares(indices):
+        fines = tf.range(1, tf.shape(indices)[0])
+        return tf.data.Dataset.from_tensor_slices(fines).map(lambda i: (indices[:i], indices[i]))
+
+    # --- Pipeline tf.data: conversión en paralelo, mezcla, lotes agrupados por longitud y prefetch ---
+    # Agrupar por longitud evita rellenar prefijos cortos hasta maxlen. Como el
+    # Embedding usa mask_zero, el relleno se ignora y da igual que quede al final
+    limites = [b for b in (2, 4, 6, 8, 12, 16, 24, 32, 48) if b < maxlen]
+    dataset = (
+        tf.data.TextLineDataset(args.corpus)
+        .map(a_indices, num_parallel_calls=tf.data.AUTOTUNE)
+        .interleave(pares, cycle_length=16, num_parallel_calls=tf.data.AUTOTUNE, deterministic=False)
+        .shuffle(args.buffer_mezcla)
+        .bucket_by_sequence_length(
+            element_length_func=lambda seq, target: tf.shape(seq)[0],
+            bucket_boundaries=limites,
+            bucket_batch_sizes=[args.batch_size] * (len(limites) + 1))
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+    # --- 3. Modelo con longitud de entrada variable y máscara de relleno ---
+    model = Sequential([
+        tf.keras.Input(shape=(None,), dtype="int32"),
+        Embedding(input_dim=vocab_size, output_dim=64, mask_zero=True),  # Embedding que ignora el índice 0
+        LSTM(128),                                                        # Capa LSTM con 128 unidades
+        Dense(vocab_size, activation='softmax')                          # Capa de salida con softmax
+    ])
+
+    # --- Compilar modelo ---
+    # Con etiquetas enteras se usa la versión dispersa de la entropía cruzada (sin one-hot)
+    model.compile(loss='sparse_categorical_crossentropy', optimizer='adam',
+                  metrics=['accuracy', EjemplosEntrenados()])
+
+    # Mostrar resumen del modelo
+    model.summary()
+
+    # --- 4. Entrenamiento del modelo ---
+    model.fit(dataset, epochs=args.epocas, callbacks=[EjemplosPorSegundo()])
 
 # --- 5. Guardar el modelo y los mapas de caracteres ---
-model.save("model/autocomplete_lstm.h5")  # Guardar modelo entrenado
+model.save(os.path.join(args.dir_modelo, "autocomplete_lstm.h5"))  # Guardar modelo entrenado
 
 # Guardar los diccionarios de conversión y longitud máxima de secuencia
-with open("model/char_maps.pkl", "wb") as f:
+with open(os.path.join(args.dir_modelo, "char_maps.pkl"), "wb") as f:
     pickle.dump((char2idx, idx2char, maxlen), f)
 
 # --- Fin del entrenamiento ---
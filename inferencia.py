@@ -0,0 +1,401 @@
+import json              # Biblioteca para leer la configuración guardada del modelo
+import pickle            # Biblioteca para cargar los mapas de caracteres
+import threading         # Biblioteca para proteger el estado compartido entre hilos
+from collections import OrderedDict  # Diccionario ordenado para la caché LRU
+import numpy as np       # Biblioteca para cálculo numérico
+
+
+# --- Funciones de activación usadas por la LSTM de Keras ---
+def sigmoide(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+# --- Leer configuración y pesos de un modelo Keras guardado en .h5 ---
+# Devuelve la lista de capas de la configuración y un diccionario
+# nombre de capa -> {nombre de peso: arreglo}
+def leer_h5(path):
+    import h5py          # Biblioteca para leer el archivo .h5 de Keras (solo se necesita al cargar)
+    with h5py.File(path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        grupo = f["model_weights"] if "model_weights" in f else f
+        pesos = {}
+        for nombre in grupo.attrs["layer_names"]:
+            nombre = nombre.decode() if isinstance(nombre, bytes) else str(nombre)
+            datos = {}
+
+            def guardar(ruta, obj):
+                if isinstance(obj, h5py.Dataset):
+                    # Keras 2 guarda 'kernel:0', Keras 3 guarda 'kernel'
+                    datos[ruta.split("/")[-1].split(":")[0]] = obj[()]
+
+            grupo[nombre].visititems(guardar)
+            pesos[nombre] = datos
+    return config["config"]["layers"], pesos
+
+
+# --- Modelo Embedding -> LSTM -> Dense implementado con NumPy ---
+# Reproduce la inferencia de autocomplete_lstm.h5 sin cargar TensorFlow. Como la
+# entrada es un índice de carácter, la proyección de entrada de la LSTM
+# (embedding @ kernel + bias) se precalcula para cada carácter en una tabla
+class ModeloLSTM:
+    def __init__(self, embeddings, kernel, recurrent_kernel, bias, dense_kernel, dense_bias,
+                 maxlen, mask_zero=False):
+        self.entrada = (embeddings.astype(np.float32) @ kernel.astype(np.float32)
+                        + bias.astype(np.float32))
+        self.recurrente = recurrent_kernel.astype(np.float32)
+        self.dense_kernel = dense_kernel.astype(np.float32)
+        self.dense_bias = dense_bias.astype(np.float32)
+        self.unidades = self.recurrente.shape[0]
+        self.maxlen = maxlen
+        self.mask_zero = mask_zero
+
+        # Estados tras k pasos de relleno (índice 0), para k = 0..maxlen.
+        # Con pad_sequences el relleno va al inicio, así que una secuencia de
+        # longitud n empieza desde el estado con maxlen - n pasos de relleno
+        h = np.zeros((1, self.unidades), np.float32)
+        c = np.zeros((1, self.unidades), np.float32)
+        relleno_h, relleno_c = [h], [c]
+        cero = np.zeros(1, np.int64)
+        for _ in range(maxlen):
+            h, c = self.paso(cero, h, c)
+            relleno_h.append(h)
+            relleno_c.append(c)
+        self.relleno_h = np.concatenate(relleno_h)
+        self.relleno_c = np.concatenate(relleno_c)
+
+    # --- Construir el modelo a partir del archivo guardado por entrenar_modelo.py ---
+    @classmethod
+    def desde_h5(cls, path, maxlen):
+        capas, pesos = leer_h5(path)
+        por_clase = {capa["class_name"]: capa["config"] for capa in capas}
+        emb, lstm, dense = por_clase["Embedding"], por_clase["LSTM"], por_clase["Dense"]
+        if lstm.get("activation", "tanh") != "tanh" or lstm.get("recurrent_activation", "sigmoid") != "sigmoid":
+            raise ValueError("Solo se soportan LSTM con activaciones tanh y sigmoid")
+        pe, pl, pd = pesos[emb["name"]], pesos[lstm["name"]], pesos[dense["name"]]
+        return cls(pe["embeddings"], pl["kernel"], pl["recurrent_kernel"], pl["bias"],
+                   pd["kernel"], pd["bias"], maxlen, emb.get("mask_zero", False))
+
+    # --- Avanzar un paso de la LSTM para un lote de caracteres ---
+    # tokens: (B,), h y c: (B, unidades). Devuelve los nuevos (h, c)
+    def paso(self, tokens, h, c):
+        z = self.entrada[tokens] + h @ self.recurrente
+        i, f, g, o = np.split(z, 4, axis=-1)   # Orden de compuertas de Keras: i, f, c, o
+        c_nuevo = sigmoide(f) * c + sigmoide(i) * np.tanh(g)
+        h_nuevo = sigmoide(o) * np.tanh(c_nuevo)
+        if self.mask_zero:
+            # Con máscara, los pasos de relleno no modifican el estado
+            activo = (tokens != 0)[:, None]
+            h_nuevo = np.where(activo, h_nuevo, h)
+            c_nuevo = np.where(activo, c_nuevo, c)
+        return h_nuevo, c_nuevo
+
+    # --- Capa de salida: probabilidades de cada carácter a partir del estado h ---
+    def probabilidades(self, h):
+        return softmax(h @ self.dense_kernel + self.dense_bias)
+
+    # --- Estados finales (h, c) de un lote de secuencias de índices ---
+    # Todas las secuencias se rellenan al inicio hasta la más larga (L) y se parte
+    # del estado con maxlen - L pasos de relleno, así el resultado es el mismo que
+    # rellenando hasta maxlen pero sin recorrer los pasos de relleno comunes
+    def estado_lote(self, secuencias):
+        secuencias = [list(s)[-self.maxlen:] for s in secuencias]   # Truncado al inicio como pad_sequences
+        largo = max((len(s) for s in secuencias), default=0)
+        tokens = np.zeros((len(secuencias), largo), np.int64)
+        for fila, s in enumerate(secuencias):
+            if s:
+                tokens[fila, largo - len(s):] = s
+        h = np.repeat(self.relleno_h[self.maxlen - largo][None], len(secuencias), axis=0)
+        c = np.repeat(self.relleno_c[self.maxlen - largo][None], len(secuencias), axis=0)
+        for t in range(largo):
+            h, c = self.paso(tokens[:, t], h, c)
+        return h, c
+
+    # --- Estados iniciales de un lote de secuencias para 'filas' longitudes finales ---
+    # Devuelve (h, c) de forma (secuencias, filas, unidades), donde la fila j es el estado
+    # de SesionInferencia para una longitud final n + j. Las secuencias se rellenan al
+    # inicio hasta la más larga (L): partir del estado con maxlen - L - j pasos de relleno
+    # y recorrer el relleno equivale a partir del de maxlen - n - j. Requiere L + filas - 1 <= maxlen
+    def estado_filas(self, secuencias, filas):
+        largo = max((len(s) for s in secuencias), default=0)
+        tokens = np.zeros((len(secuencias), filas, largo), np.int64)
+        for fila, s in enumerate(secuencias):
+            if s:
+                tokens[fila, :, largo - len(s):] = s
+        tokens = tokens.reshape(-1, largo)
+        inicio = self.maxlen - largo - np.arange(filas)
+        h = np.tile(self.relleno_h[inicio], (len(secuencias), 1))
+        c = np.tile(self.relleno_c[inicio], (len(secuencias), 1))
+        for t in range(largo):
+            h, c = self.paso(tokens[:, t], h, c)
+        return h.reshape(len(secuencias), filas, -1), c.reshape(len(secuencias), filas, -1)
+
+    # --- Predicción por lotes equivalente a pad_sequences + model.predict ---
+    def predecir_lote(self, secuencias):
+        h, _ = self.estado_lote(secuencias)
+        return self.probabilidades(h)
+
+
+# --- Sesión de inferencia incremental ---
+# Mantiene el estado de la LSTM mientras se escribe: cada carácter nuevo avanza
+# un solo paso y borrar recupera el estado anterior sin recalcular nada.
+# Para dar exactamente el mismo resultado que rellenar hasta maxlen, se avanza a la
+# vez una fila de estado por cada longitud final posible (la fila m parte del estado
+# con maxlen - m pasos de relleno), todas en una sola multiplicación por lotes
+class SesionInferencia:
+    def __init__(self, modelo, char2idx):
+        self.modelo = modelo
+        self.char2idx = char2idx
+        self.reiniciar()
+
+    # --- Volver al texto vacío, u opcionalmente a un texto dado ---
+    def reiniciar(self, texto=""):
+        m = self.modelo
+        # estados[n] = (h, c) con una fila por cada longitud final m >= n; la fila 0 es la actual
+        self.estados = [(m.relleno_h[::-1].copy(), m.relleno_c[::-1].copy())]
+        self.tokens = []
+        self.texto = ""
+        for caracter in texto:
+            self.agregar(caracter)
+
+    # --- Avanzar el estado con un carácter escrito ---
+    def agregar(self, caracter):
+        caracter = caracter.lower()
+        token = self.char2idx.get(caracter, 0)   # Carácter desconocido -> 0 (relleno)
+        self.tokens.append(token)
+        self.texto += caracter
+        h, c = self.estados[-1]
+        if len(h) > 1:
+            lote = np.full(len(h) - 1, token, np.int64)
+            self.estados.append(self.modelo.paso(lote, h[1:], c[1:]))
+        else:
+            # Texto más largo que maxlen: la ventana se desplaza y se recalcula completa
+            self.estados.append(self.modelo.estado_lote([self.tokens]))
+
+    # --- Retroceder un carácter recuperando el estado guardado ---
+    def borrar(self):
+        if self.tokens:
+            self.tokens.pop()
+            self.texto = self.texto[:-1]
+            self.estados.pop()
+
+    # --- Ajustar la sesión a un texto completo reutilizando el prefijo común ---
+    def sincronizar(self, texto):
+        texto = texto.lower()
+        comun = 0
+        for a, b in zip(self.texto, texto):
+            if a != b:
+                break
+            comun += 1
+        while len(self.texto) > comun:
+            self.borrar()
+        for caracter in texto[comun:]:
+            self.agregar(caracter)
+
+    # --- Probabilidades del siguiente carácter para el texto actual ---
+    def probabilidades(self):
+        h, _ = self.estados[-1]
+        return self.modelo.probabilidades(h[:1])[0]
+
+    # --- Índice del carácter más probable ---
+    def siguiente_indice(self):
+        return int(np.argmax(self.probabilidades()))
+
+
+# --- Completado de palabras con búsqueda en haz (beam search) ---
+# Extiende la última palabra del texto carácter a carácter hasta un separador,
+# conservando las 'ancho_haz' hipótesis más probables. En cada paso todas las
+# hipótesis se evalúan en una sola pasada por lotes, también las de consultas distintas
+# cuando se completan juntas con completar_lote. Los resultados se guardan en
+# una caché LRU por prefijo, así repetir un prefijo o borrar caracteres es inmediato
+class CompletadorPalabras:
+    def __init__(self, modelo, char2idx, idx2char, ancho_haz=4, max_caracteres=12,
+                 tam_cache=512, separadores=" ,.?¿"):
+        self.modelo = modelo
+        self.idx2char = idx2char
+        self.ancho_haz = ancho_haz
+        self.max_caracteres = max_caracteres  # Máximo de caracteres agregados a la palabra
+        self.tam_cache = tam_cache
+        # Índices que marcan el fin de palabra: separadores y el relleno (0)
+        self.fin = np.zeros(len(modelo.dense_bias), bool)
+        self.fin[0] = True
+        for caracter in separadores:
+            if caracter in char2idx:
+                self.fin[char2idx[caracter]] = True
+        self.sesion = SesionInferencia(modelo, char2idx)
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.aciertos = 0   # Consultas respondidas desde la caché
+        self.fallos = 0     # Consultas que necesitaron búsqueda
+
+    # --- Contadores de la caché de completaciones ---
+    def contadores(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+            "en_cache": len(self.cache),
+        }
+
+    # --- Devolver hasta k palabras completadas como lista de (palabra, log-probabilidad) ---
+    def completar(self, texto, k=3):
+        return self.completar_lote([(texto, k)])[0]
+
+    # --- Completar varias consultas (texto, k) a la vez ---
+    # Las consultas que no están en caché avanzan juntas: cada paso de la búsqueda hace una
+    # sola llamada al modelo con las hipótesis de todas ellas. Devuelve una lista por consulta
+    def completar_lote(self, consultas):
+        # k inválido se rechaza antes de tocar la caché o la poda de la búsqueda
+        for _, k in consultas:
+            if not isinstance(k, int) or isinstance(k, bool) or k < 1:
+                raise ValueError(f"k debe ser un entero positivo, se recibió {k!r}")
+        consultas = [(texto.lower(), k) for texto, k in consultas]
+        with self.lock:
+            resultados = {}
+            pendientes = []
+            for clave in consultas:
+                if clave in self.cache:
+                    self.cache.move_to_end(clave)
+                    resultados[clave] = self.cache[clave]
+                    self.aciertos += 1
+                elif clave in resultados:
+                    self.aciertos += 1            # Repetida dentro del mismo lote
+                else:
+                    resultados[clave] = None
+                    pendientes.append(clave)
+                    self.fallos += 1
+            for clave, resultado in zip(pendientes, self._buscar_lote(pendientes)):
+                resultados[clave] = resultado
+                self.cache[clave] = resultado
+                if len(self.cache) > self.tam_cache:
+                    self.cache.popitem(last=False)   # Descartar el prefijo usado hace más tiempo
+            return [resultados[clave] for clave in consultas]
+
+    def _buscar_lote(self, consultas):
+        m = self.modelo
+        # Solo hacen falta las filas de las longitudes que se pueden alcanzar agregando caracteres
+        filas = self.max_caracteres + 1
+        busquedas = [None] * len(consultas)
+
+        # Con varias consultas, los estados iniciales de los textos cortos se calculan juntos
+        # en una sola pasada, sin mover la sesión compartida
+        juntas = [i for i, (texto, _) in enumerate(consultas) if len(texto) + filas - 1 <= m.maxlen]
+        if len(juntas) > 1:
+            secuencias = [[self.sesion.char2idx.get(c, 0) for c in consultas[i][0]] for i in juntas]
+            h, c = m.estado_filas(secuencias, filas)
+            for j, i in enumerate(juntas):
+                texto, k = consultas[i]
+                # Cada hipótesis: (extensión, log-probabilidad, tokens, filas h, filas c)
+                busquedas[i] = {"palabra": texto.split(" ")[-1], "k": k, "terminadas": {},
+                                "haz": [("", 0.0, tuple(secuencias[j]), h[j], c[j])]}
+
+        # El resto parte de la sesión incremental, que reutiliza el prefijo común. Se
+        # sincroniza en orden alfabético para avanzar solo los caracteres que cambian
+        for i in sorted(range(len(consultas)), key=lambda i: consultas[i][0]):
+            if busquedas[i] is not None:
+                continue
+            texto, k = consultas[i]
+            self.sesion.sincronizar(texto)
+            h, c = self.sesion.estados[-1]
+            busquedas[i] = {"palabra": texto.split(" ")[-1], "k": k, "terminadas": {},
+                            "haz": [("", 0.0, tuple(self.sesion.tokens), h[:filas], c[:filas])]}
+
+        activas = list(busquedas)
+        for _ in range(self.max_caracteres):
+            if not activas:
+                break
+            # Evaluar las hipótesis de todas las búsquedas activas en una sola pasada
+            actuales = np.stack([hip[3][0] for b in activas for hip in b["haz"]])
+            logp = np.log(m.probabilidades(actuales) + 1e-12)
+            cortes = np.cumsum([len(b["haz"]) for b in activas])[:-1]
+            siguen, elegidas = [], []
+            for b, logp_b in zip(activas, np.split(logp, cortes)):
+                elegidas_b = self._elegir(b, logp_b)
+                if elegidas_b:
+                    siguen.append((b, len(elegidas_b)))
+                    elegidas.extend(elegidas_b)
+            # Avanzar las extensiones elegidas de todas las búsquedas en una sola llamada
+            avanzadas = self._avanzar(elegidas)
+            inicio = 0
+            for b, n in siguen:
+                b["haz"] = avanzadas[inicio:inicio + n]
+                inicio += n
+            activas = [b for b, _ in siguen]
+
+        # Las hipótesis que llegaron al máximo de caracteres también se ofrecen
+        for b in activas:
+            for hip in b["haz"]:
+                if hip[1] > b["terminadas"].get(hip[0], -np.inf):
+                    b["terminadas"][hip[0]] = hip[1]
+
+        resultados = []
+        for b in busquedas:
+            orden = sorted(b["terminadas"].items(), key=lambda item: -item[1])[:b["k"]]
+            resultados.append([(b["palabra"] + extension, puntaje) for extension, puntaje in orden])
+        return resultados
+
+    # --- Un paso de una búsqueda: guardar palabras terminadas y elegir las mejores extensiones ---
+    # Devuelve una lista de (hipótesis, token, log-probabilidad), vacía si la búsqueda terminó
+    def _elegir(self, busqueda, logp):
+        haz, terminadas, k = busqueda["haz"], busqueda["terminadas"], busqueda["k"]
+        logp += np.array([hip[1] for hip in haz], np.float32)[:, None]
+
+        # Las hipótesis que terminan en separador se guardan como palabras completas
+        for b, hip in enumerate(haz):
+            if hip[0]:
+                puntaje = float(logp[b, self.fin].max())
+                if puntaje > terminadas.get(hip[0], -np.inf):
+                    terminadas[hip[0]] = puntaje
+
+        # Elegir las mejores extensiones con caracteres que no son fin de palabra
+        logp[:, self.fin] = -np.inf
+        plano = logp.ravel()
+        n = min(self.ancho_haz, int(np.isfinite(plano).sum()))
+        if n == 0:
+            return []
+        mejores = np.argpartition(-plano, n - 1)[:n]
+        mejores = mejores[np.argsort(-plano[mejores])]
+
+        # Poda: la log-probabilidad solo puede bajar, así que si ninguna extensión
+        # supera a la k-ésima palabra terminada, la búsqueda ya no cambia el resultado
+        if len(terminadas) >= k and plano[mejores[0]] <= sorted(terminadas.values())[-k]:
+            return []
+
+        vocab = logp.shape[1]
+        return [(haz[i // vocab], i % vocab, float(plano[i])) for i in mejores]
+
+    # --- Avanzar un paso las extensiones elegidas en una sola llamada por lotes ---
+    # Cada hipótesis puede tener un número distinto de filas (según la longitud de su texto)
+    def _avanzar(self, elegidas):
+        m = self.modelo
+        estados = [None] * len(elegidas)
+        largas = [j for j, (hip, _, _) in enumerate(elegidas) if len(hip[3]) > 1]
+        if largas:
+            filas = [len(elegidas[j][0][3]) - 1 for j in largas]
+            h = np.concatenate([elegidas[j][0][3][1:] for j in largas])
+            c = np.concatenate([elegidas[j][0][4][1:] for j in largas])
+            lote = np.repeat(np.array([elegidas[j][1] for j in largas], np.int64), filas)
+            h, c = m.paso(lote, h, c)
+            cortes = np.cumsum(filas)[:-1]
+            for j, h_j, c_j in zip(largas, np.split(h, cortes), np.split(c, cortes)):
+                estados[j] = (h_j, c_j)
+        cortas = [j for j, (hip, _, _) in enumerate(elegidas) if len(hip[3]) == 1]
+        if cortas:
+            # Texto más largo que maxlen: se recalculan las ventanas desplazadas
+            h, c = m.estado_lote([elegidas[j][0][2] + (elegidas[j][1],) for j in cortas])
+            for j, h_j, c_j in zip(cortas, h, c):
+                estados[j] = (h_j[None], c_j[None])
+        return [(hip[0] + self.idx2char.get(tok, ""), puntaje, hip[2] + (tok,), h, c)
+                for (hip, tok, puntaje), (h, c) in zip(elegidas, estados)]
+
+
+# --- Cargar modelo y mapas de caracteres guardados por entrenar_modelo.py ---
+def cargar_modelo(path_modelo="model/autocomplete_lstm.h5", path_mapas="model/char_maps.pkl"):
+    with open(path_mapas, "rb") as f:
+        char2idx, idx2char, maxlen = pickle.load(f)
+    return ModeloLSTM.desde_h5(path_modelo, maxlen), char2idx, idx2char
@@ -0,0 +1,125 @@
+import json              # Biblioteca para exportar instantáneas en JSONL
+import time              # Biblioteca para relojes monotónicos
+from collections import deque
+import cv2               # Biblioteca para dibujar el panel de latencias
+
+
+# --- Percentil p (0-100) de una lista ya ordenada ---
+def percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+# --- Medición de una etapa con 'with instrumentacion.etapa(nombre):' ---
+class _Etapa:
+    __slots__ = ("inst", "nombre", "inicio")
+
+    def __init__(self, inst, nombre):
+        self.inst = inst
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.inst.registrar(self.nombre, time.perf_counter() - self.inicio)
+
+
+# --- Instrumentación por etapas del bucle de frames ---
+# Cada etapa guarda sus últimas 'tam_ventana' duraciones (ventana móvil) y los
+# totales desde el inicio. Registrar cuesta un append; los percentiles solo se
+# calculan al dibujar el panel o exportar. Se puede registrar desde varios hilos
+class Instrumentacion:
+    def __init__(self, tam_ventana=300, path_jsonl=None, intervalo_exportar=5.0):
+        self.tam_ventana = tam_ventana
+        self.ventanas = {}             # Etapa -> deque con las últimas duraciones (segundos)
+        self.totales = {}              # Etapa -> [cantidad, suma de segundos]
+        self.path_jsonl = path_jsonl   # Archivo donde se agregan instantáneas periódicas
+        self.intervalo_exportar = intervalo_exportar
+        self.mostrar_panel = False     # Panel de FPS y latencias sobre el frame
+        self._ultimo_export = time.monotonic()
+        self._frames = deque(maxlen=tam_ventana)   # Instantes de los últimos frames para el FPS
+        self._panel = []               # Líneas del panel, recalculadas cada medio segundo
+        self._panel_t = 0.0
+        self.contadores = {}           # Nombre -> función que devuelve un diccionario de contadores
+
+    def etapa(self, nombre):
+        return _Etapa(self, nombre)
+
+    # --- Agregar contadores propios de otro componente a las instantáneas y al panel ---
+    def agregar_contadores(self, nombre, funcion):
+        self.contadores[nombre] = funcion
+
+    # --- Registrar la duración (en segundos) de una etapa ---
+    def registrar(self, nombre, segundos):
+        ventana = self.ventanas.get(nombre)
+        if ventana is None:
+            # El total se crea antes de publicar la ventana: resumen() corre en otro hilo y
+            # consulta totales[nombre] para cada etapa que ve en ventanas
+            self.totales.setdefault(nombre, [0, 0.0])
+            ventana = self.ventanas.setdefault(nombre, deque(maxlen=self.tam_ventana))
+        total = self.totales[nombre]
+        total[0] += 1
+        total[1] += segundos
+        ventana.append(segundos)
+
+    # --- Marcar el final de un frame mostrado (para calcular FPS) ---
+    def marcar_frame(self):
+        self._frames.append(time.monotonic())
+
+    def fps(self):
+        frames = self._frames.copy()
+        if len(frames) < 2 or frames[-1] == frames[0]:
+            return 0.0
+        return (len(frames) - 1) / (frames[-1] - frames[0])
+
+    # --- Resumen por etapa: cantidad, media total y p50/p95/p99 de la ventana (en ms) ---
+    def resumen(self):
+        datos = {}
+        for nombre, ventana in list(self.ventanas.items()):
+            ordenados = sorted(ventana.copy())
+            n, suma = self.totales.get(nombre, (0, 0.0))
+            datos[nombre] = {
+                "n": n,
+                "media_ms": round(suma / max(n, 1) * 1000, 4),
+                "p50_ms": round(percentil(ordenados, 50) * 1000, 4),
+                "p95_ms": round(percentil(ordenados, 95) * 1000, 4),
+                "p99_ms": round(percentil(ordenados, 99) * 1000, 4),
+            }
+        return datos
+
+    # --- Agregar una instantánea al archivo JSONL si pasó el intervalo ---
+    def exportar_si_toca(self, forzar=False):
+        if not self.path_jsonl:
+            return
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultimo_export < self.intervalo_exportar:
+            return
+        self._ultimo_export = ahora
+        instantanea = {"t": time.time(), "fps": round(self.fps(), 2), "etapas": self.resumen()}
+        for nombre, funcion in self.contadores.items():
+            instantanea[nombre] = funcion()
+        with open(self.path_jsonl, "a", encoding="utf-8") as f:
+            f.write(json.dumps(instantanea) + "\n")
+
+    # --- Dibujar el panel de FPS y latencias si está activado ---
+    def dibujar(self, img, x=None, y=20):
+        if not self.mostrar_panel:
+            return
+        ahora = time.monotonic()
+        if ahora - self._panel_t > 0.5:
+            self._panel_t = ahora
+            self._panel = [f"FPS {self.fps():.1f}   etapa  p50/p95/p99 ms"]
+            for nombre, d in self.resumen().items():
+                self._panel.append(f"{nombre:<14} {d['p50_ms']:.1f} / {d['p95_ms']:.1f} / {d['p99_ms']:.1f}")
+            for nombre, funcion in self.contadores.items():
+                for clave, valor in funcion().items():
+                    if isinstance(valor, dict):
+                        valor = " / ".join(f"{k} {v}" for k, v in valor.items())
+                    self._panel.append(f"{nombre}.{clave}: {valor}")
+        x = img.shape[1] - 420 if x is None else x
+        cv2.rectangle(img, (x - 10, y - 15), (x + 410, y + 20 * len(self._panel)), (0, 0, 0), -1)
+        for i, linea in enumerate(self._panel):
+            cv2.putText(img, linea, (x, y + 5 + 20 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
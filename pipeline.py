@@ -0,0 +1,185 @@
+import threading         # Biblioteca para hilos y sincronización
+import time              # Biblioteca para manejo de tiempo y temporizadores
+import cv2               # Biblioteca para procesamiento de imágenes y video
+
+
+# --- Buzón que conserva solo el elemento más reciente ---
+# Es una cola acotada de tamaño 1: poner un elemento nuevo reemplaza al anterior
+# si nadie lo ha leído todavía, así los consumidores nunca procesan datos viejos
+class Buzon:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0            # Número de secuencia del último elemento publicado
+        self._leido = True       # Si algún consumidor ya tomó el último elemento
+        self._cerrado = False
+        self.descartados = 0     # Elementos reemplazados sin haber sido leídos
+
+    # --- Publicar un elemento nuevo, descartando el anterior ---
+    def poner(self, item):
+        with self._cond:
+            if not self._leido:
+                self.descartados += 1
+            self._item = item
+            self._seq += 1
+            self._leido = False
+            self._cond.notify_all()
+
+    # --- Esperar un elemento más nuevo que el ya visto ---
+    # Devuelve (secuencia, elemento) o (visto, None) si se agota el tiempo o se cierra
+    def tomar(self, visto=0, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > visto or self._cerrado, timeout):
+                return visto, None
+            if self._seq <= visto:
+                return visto, None
+            self._leido = True
+            return self._seq, self._item
+
+    # --- Consultar el último elemento sin esperar ---
+    def ultimo(self):
+        with self._cond:
+            if self._seq:
+                self._leido = True
+            return self._seq, self._item
+
+    # --- Despertar a los consumidores para que terminen ---
+    def cerrar(self):
+        with self._cond:
+            self._cerrado = True
+            self._cond.notify_all()
+
+
+# --- Hilo de captura: lee la cámara continuamente y publica el último frame ---
+# Cada frame se publica como (imagen volteada, instante de captura).
+# Si necesita_frame() devuelve False (por ejemplo en modo reposo, cuando no toca
+# detectar ni dibujar) el frame se descarta con grab(), sin decodificarlo ni voltearlo,
+# y no se publica, así tampoco despierta al hilo de seguimiento ni a la interfaz
+class HiloCaptura(threading.Thread):
+    def __init__(self, cap, buzon, voltear=True, instrumentacion=None, necesita_frame=None):
+        super().__init__(name="captura", daemon=True)
+        self.cap = cap
+        self.buzon = buzon
+        self.voltear = voltear
+        self.instrumentacion = instrumentacion
+        self.necesita_frame = necesita_frame
+        self.descartados = 0             # Frames descartados con grab()
+        self.detener_evento = threading.Event()
+
+    def run(self):
+        inst = self.instrumentacion
+        while not self.detener_evento.is_set():
+            if self.necesita_frame and not self.necesita_frame():
+                if not self.cap.grab():      # Esperar el siguiente frame sin decodificarlo
+                    time.sleep(0.01)
+                self.descartados += 1
+                continue
+            inicio = time.perf_counter()
+            success, img = self.cap.read()   # Capturar frame de la cámara
+            t_captura = time.monotonic()
+            if not success:
+                time.sleep(0.01)             # Esperar un poco si la cámara no entregó imagen
+                continue
+            leido = time.perf_counter()
+            if self.voltear:
+                img = cv2.flip(img, 1)       # Voltear horizontal para espejo
+            if inst:
+                inst.registrar("captura", leido - inicio)
+                inst.registrar("voltear", time.perf_counter() - leido)
+            self.buzon.poner((img, t_captura))
+
+    def detener(self):
+        self.detener_evento.set()
+
+
+# --- Hilo de seguimiento: procesa siempre el frame más reciente ---
+# Los frames que llegan mientras se procesa uno se descartan en el buzón de entrada.
+# Publica (resultado, instante de captura del frame procesado). Si procesar falla
+# se informa el error y se publica un resultado vacío, así el hilo sigue vivo y la
+# interfaz no reutiliza la última mano vista
+class HiloSeguimiento(threading.Thread):
+    def __init__(self, procesar, buzon_frames, buzon_manos):
+        super().__init__(name="seguimiento", daemon=True)
+        self.procesar = procesar         # Función imagen BGR -> resultado de MediaPipe
+        self.buzon_frames = buzon_frames
+        self.buzon_manos = buzon_manos
+        self.errores = 0                 # Frames en los que procesar lanzó una excepción
+        self.detener_evento = threading.Event()
+
+    def run(self):
+        visto = 0
+        while not self.detener_evento.is_set():
+            visto, frame = self.buzon_frames.tomar(visto, timeout=0.1)
+            if frame is None:
+                continue
+            img, t_captura = frame
+            try:
+                result = self.procesar(img)
+            except Exception as e:
+                self.errores += 1
+                # Se informa el primer error y luego uno de cada 100 para no inundar la consola
+                if self.errores % 100 == 1:
+                    print(f"Error en el seguimiento de la mano ({self.errores} en total): {e!r}")
+                result = None
+            self.buzon_manos.poner((result, t_captura))
+
+    def detener(self):
+        self.detener_evento.set()
+
+
+# --- Pipeline completo: captura y seguimiento en hilos separados ---
+# El hilo de interfaz (el que llama a cv2.imshow) consume el frame y las marcas más recientes.
+# Un resultado de seguimiento capturado más de 'max_antiguedad' segundos antes que el
+# frame actual (o cualquiera si el hilo de seguimiento terminó) se descarta
+class PipelineCamara:
+    def __init__(self, cap, procesar, voltear=True, instrumentacion=None, necesita_frame=None,
+                 max_antiguedad=0.5):
+        self.frames = Buzon()
+        self.manos = Buzon()
+        self.captura = HiloCaptura(cap, self.frames, voltear, instrumentacion, necesita_frame)
+        self.seguimiento = HiloSeguimiento(procesar, self.frames, self.manos)
+        self.max_antiguedad = max_antiguedad
+        self.resultados_viejos = 0       # Resultados descartados por antiguos o sin hilo de seguimiento
+        self._visto = 0
+
+    def iniciar(self):
+        self.captura.start()
+        self.seguimiento.start()
+        return self
+
+    # --- Obtener el frame más nuevo y el último resultado de seguimiento disponible ---
+    # Devuelve (imagen, instante de captura, resultado, instante de captura del frame
+    # del que salió el resultado) o None si no llegó ningún frame.
+    # Con copiar=False la imagen es la misma que lee el hilo de seguimiento y no se debe
+    # modificar; sirve para consumir frames que no se van a dibujar
+    def siguiente(self, timeout=1.0, copiar=True):
+        self._visto, frame = self.frames.tomar(self._visto, timeout)
+        if frame is None:
+            return None
+        img, t_captura = frame
+        _, manos = self.manos.ultimo()
+        result, t_resultado = manos if manos else (None, None)
+        if result is not None and (not self.seguimiento.is_alive()
+                                   or t_captura - t_resultado > self.max_antiguedad):
+            self.resultados_viejos += 1
+            result = None
+        # Se copia la imagen porque el hilo de seguimiento puede estar leyéndola mientras se dibuja
+        return img.copy() if copiar else img, t_captura, result, t_resultado
+
+    # --- Contadores de frames y resultados descartados en cada etapa ---
+    def contadores(self):
+        return {
+            "frames_reemplazados": self.frames.descartados,   # Frames que el seguimiento no llegó a procesar
+            "manos_reemplazadas": self.manos.descartados,     # Resultados que la interfaz no llegó a usar
+            "frames_sin_decodificar": self.captura.descartados,
+            "resultados_viejos": self.resultados_viejos,
+            "errores_seguimiento": self.seguimiento.errores,
+        }
+
+    def detener(self):
+        self.captura.detener()
+        self.seguimiento.detener()
+        self.frames.cerrar()
+        self.manos.cerrar()
+        self.captura.join(timeout=1.0)
+        self.seguimiento.join(timeout=1.0)
@@ -0,0 +1,103 @@
+import threading         # Biblioteca para proteger el estado compartido entre hilos
+import time              # Biblioteca para relojes monotónicos
+
+
+# --- Planificador adaptativo de detección y dibujo ---
+# Modo activo: se detecta la mano y se redibuja en cada frame.
+# Modo reposo: si pasaron 'tiempo_reposo' segundos sin ver ninguna mano, la detección se
+# hace solo cada 'intervalo_deteccion' segundos sobre un frame reducido a 'escala' y la
+# ventana se redibuja cada 'intervalo_dibujo' segundos. En cuanto una detección encuentra
+# una mano se vuelve al modo activo, así la espera máxima es un intervalo de detección.
+# La palma de MediaPipe se detecta sobre una imagen de 192x192, por eso una escala baja
+# (320x180 para 1280x720) sigue encontrando una mano frente a la cámara.
+# La detección se registra desde el hilo de seguimiento, el dibujo desde el bucle principal
+# y resumen() desde las métricas, por eso todo acceso al estado pasa por un lock
+class PlanificadorReposo:
+    def __init__(self, tiempo_reposo=10.0, intervalo_deteccion=0.25, escala=0.25, intervalo_dibujo=0.5,
+                 reloj=time.monotonic):
+        self.tiempo_reposo = tiempo_reposo              # Segundos sin mano antes de pasar a reposo
+        self.intervalo_deteccion = intervalo_deteccion  # Segundos entre detecciones en reposo
+        self.escala = escala                            # Escala del frame para detectar en reposo
+        self.intervalo_dibujo = intervalo_dibujo        # Segundos entre redibujos en reposo
+        self.reloj = reloj
+        self.lock = threading.Lock()
+        ahora = reloj()
+        self.modo = "activo"
+        self.ultima_mano = ahora
+        self._ultima_deteccion = None
+        self._ultimo_dibujo = None
+        self._inicio_modo = ahora
+        # Contadores por modo: segundos, detecciones hechas, frames dibujados y frames omitidos
+        self.segundos = {"activo": 0.0, "reposo": 0.0}
+        self.detecciones = {"activo": 0, "reposo": 0}
+        self.dibujados = {"activo": 0, "reposo": 0}
+        self.omitidos = 0          # Frames en reposo sin detección ni dibujo
+        self.cambios = 0           # Transiciones entre modos
+
+    @property
+    def en_reposo(self):
+        return self.modo == "reposo"
+
+    # --- Escala de detección para el modo actual (None: la del seguidor) ---
+    def escala_actual(self):
+        return self.escala if self.en_reposo else None
+
+    def debe_detectar(self, ahora=None):
+        ahora = self.reloj() if ahora is None else ahora
+        with self.lock:
+            if not self.en_reposo:
+                return True
+            return self._ultima_deteccion is None or ahora - self._ultima_deteccion >= self.intervalo_deteccion
+
+    def debe_dibujar(self, ahora=None):
+        ahora = self.reloj() if ahora is None else ahora
+        with self.lock:
+            if not self.en_reposo:
+                return True
+            return self._ultimo_dibujo is None or ahora - self._ultimo_dibujo >= self.intervalo_dibujo
+
+    # --- Registrar el resultado de una detección y cambiar de modo si corresponde ---
+    def registrar_deteccion(self, hay_mano, ahora=None):
+        ahora = self.reloj() if ahora is None else ahora
+        with self.lock:
+            self.detecciones[self.modo] += 1
+            self._ultima_deteccion = ahora
+            if hay_mano:
+                self.ultima_mano = ahora
+                self._cambiar("activo", ahora)
+            elif ahora - self.ultima_mano >= self.tiempo_reposo:
+                self._cambiar("reposo", ahora)
+
+    def registrar_dibujo(self, ahora=None):
+        ahora = self.reloj() if ahora is None else ahora
+        with self.lock:
+            self._ultimo_dibujo = ahora
+            self.dibujados[self.modo] += 1
+
+    def registrar_omitido(self):
+        with self.lock:
+            self.omitidos += 1
+
+    # --- Cambiar de modo acumulando el tiempo del anterior (se llama con el lock tomado) ---
+    def _cambiar(self, modo, ahora):
+        if modo == self.modo:
+            return
+        self.segundos[self.modo] += ahora - self._inicio_modo
+        self._inicio_modo = ahora
+        self.modo = modo
+        self.cambios += 1
+
+    # --- Contadores actuales (incluye el tiempo transcurrido en el modo actual) ---
+    def resumen(self):
+        ahora = self.reloj()
+        with self.lock:
+            segundos = dict(self.segundos)
+            segundos[self.modo] += ahora - self._inicio_modo
+            return {
+                "modo": self.modo,
+                "segundos": {m: round(s, 2) for m, s in segundos.items()},
+                "detecciones": dict(self.detecciones),
+                "dibujados": dict(self.dibujados),
+                "omitidos": self.omitidos,
+                "cambios": self.cambios,
+            }
@@ -0,0 +1,152 @@
+import queue             # Biblioteca para colas seguras entre hilos
+import threading         # Biblioteca para el hilo de salida
+import time              # Biblioteca para medir latencias
+
+
+# --- Emisor real de pulsaciones usando pyautogui ---
+# pyautogui.PAUSE duerme después de cada llamada, por eso se agrupan las pulsaciones.
+# pyautogui se importa al crear el emisor, así este módulo se puede usar sin pantalla
+class EmisorPyautogui:
+    def __init__(self):
+        import pyautogui     # Biblioteca para controlar el teclado y mouse del sistema
+        self.pyautogui = pyautogui
+
+    def escribir(self, texto):
+        self.pyautogui.write(texto)
+
+    def borrar(self, n):
+        self.pyautogui.press("backspace", presses=n)
+
+
+# --- Emisor de reemplazo cuando no se puede crear el real ---
+# Descarta las pulsaciones contándolas; así el hilo de salida sigue vaciando la cola
+# y vaciar() no se bloquea aunque pyautogui no esté instalado o no haya pantalla
+class EmisorNulo:
+    def __init__(self):
+        self.descartadas = 0
+
+    def escribir(self, texto):
+        self.descartadas += 1
+
+    def borrar(self, n):
+        self.descartadas += 1
+
+
+# --- Agrupar operaciones pendientes en el menor número de llamadas ---
+# Los textos consecutivos se concatenan, los retrocesos consecutivos se suman y un
+# retroceso que sigue a un texto aún no enviado lo recorta en lugar de enviarse.
+# Cada operación es (tipo, valor) o (tipo, valor, origen); el origen no se usa aquí
+def agrupar(operaciones):
+    acciones = []
+    for tipo, valor, *_ in operaciones:
+        if tipo == "texto":
+            if acciones and acciones[-1][0] == "texto":
+                acciones[-1][1] += valor
+            elif valor:
+                acciones.append(["texto", valor])
+        elif tipo == "borrar":
+            while valor > 0 and acciones and acciones[-1][0] == "texto":
+                recorte = min(valor, len(acciones[-1][1]))
+                acciones[-1][1] = acciones[-1][1][:-recorte]
+                valor -= recorte
+                if not acciones[-1][1]:
+                    acciones.pop()
+            if valor > 0:
+                if acciones and acciones[-1][0] == "borrar":
+                    acciones[-1][1] += valor
+                else:
+                    acciones.append(["borrar", valor])
+    return acciones
+
+
+# --- Cola de pulsaciones atendida por un hilo dedicado ---
+# El bucle de video solo encola operaciones y sigue; el hilo de salida toma todo lo
+# pendiente, lo agrupa y lo envía al sistema, así el render nunca espera a pyautogui.
+# Si una operación trae 'origen' (instante monotónico de captura del frame que la
+# produjo) se registra la latencia desde el dedo hasta la pulsación enviada.
+# Sin emisor se usa pyautogui, que se importa en el hilo de salida y no retrasa el arranque;
+# si no se puede crear, el error queda en 'error' y las pulsaciones se descartan con EmisorNulo
+class ColaTeclas:
+    def __init__(self, emisor=None, instrumentacion=None):
+        self.emisor = emisor
+        self.instrumentacion = instrumentacion
+        self.cola = queue.Queue()
+        self.llamadas = 0        # Llamadas realmente enviadas al emisor
+        self.operaciones = 0     # Operaciones encoladas por el bucle principal
+        self.error = None        # Excepción al crear el emisor por defecto, si la hubo
+        self.hilo = threading.Thread(target=self._trabajar, name="salida", daemon=True)
+        self.hilo.start()
+
+    # --- Encolar texto para escribir ---
+    def escribir(self, texto, origen=None):
+        self.operaciones += 1
+        self.cola.put(("texto", texto, origen))
+
+    # --- Encolar n retrocesos ---
+    def borrar(self, n=1, origen=None):
+        if n > 0:
+            self.operaciones += 1
+            self.cola.put(("borrar", n, origen))
+
+    # --- Contadores de agrupación: operaciones encoladas por cada llamada al emisor ---
+    def contadores(self):
+        contadores = {
+            "operaciones": self.operaciones,
+            "llamadas": self.llamadas,
+            "operaciones_por_llamada": round(self.operaciones / self.llamadas, 2) if self.llamadas else 0.0,
+            "pendientes": self.cola.qsize(),
+        }
+        if self.error is not None:
+            contadores["error"] = str(self.error)
+        return contadores
+
+    # --- Esperar a que se envíe todo lo encolado ---
+    def vaciar(self):
+        self.cola.join()
+
+    # --- Enviar lo pendiente y terminar el hilo ---
+    def detener(self):
+        self.cola.put(None)
+        self.hilo.join(timeout=2.0)
+
+    def _trabajar(self):
+        if self.emisor is None:
+            try:
+                self.emisor = EmisorPyautogui()
+            except Exception as e:
+                # El hilo no debe terminar: si lo hiciera, vaciar() esperaría para siempre
+                self.error = e
+                self.emisor = EmisorNulo()
+                print(f"No se pudo iniciar la salida de teclado, las pulsaciones se descartan: {e}")
+        while True:
+            pendientes = [self.cola.get()]
+            # Tomar también todo lo que se haya acumulado mientras se enviaba lo anterior
+            while True:
+                try:
+                    pendientes.append(self.cola.get_nowait())
+                except queue.Empty:
+                    break
+            terminar = None in pendientes
+            operaciones = [p for p in pendientes if p is not None]
+            try:
+                inicio = time.perf_counter()
+                for tipo, valor in agrupar(operaciones):
+                    if tipo == "texto":
+                        self.emisor.escribir(valor)
+                    else:
+                        self.emisor.borrar(valor)
+                    self.llamadas += 1
+                if self.instrumentacion and operaciones:
+                    self.instrumentacion.registrar("salida", time.perf_counter() - inicio)
+                    enviado = time.monotonic()
+                    for _, _, origen in operaciones:
+                        if origen is not None:
+                            self.instrumentacion.registrar("dedo_a_tecla", enviado - origen)
+            except Exception as e:
+                # Un error del sistema de teclado no debe detener la salida de las siguientes pulsaciones
+                print(f"Error enviando pulsaciones: {e}")
+            finally:
+                for _ in pendientes:
+                    self.cola.task_done()
+            if terminar:
+                break
@@ -0,0 +1,116 @@
+import time              # Biblioteca para medir tiempos
+import cv2               # Biblioteca para procesamiento de imágenes y video
+
+
+# --- Seguimiento de mano por región de interés ---
+# La detección se hace sobre el frame reducido; cuando hay mano, los frames
+# siguientes se recortan a un cuadro ampliado alrededor de la última mano y las
+# marcas se convierten de vuelta a coordenadas normalizadas del frame completo.
+# Si la mano se pierde dentro del recorte se vuelve a detectar en el frame completo.
+# MediaPipe (en modo video) sigue la mano usando las marcas del frame anterior en
+# coordenadas normalizadas de la imagen que recibe, por eso cada sistema de coordenadas
+# tiene su propia instancia de Hands:
+#   hands_deteccion: frame completo reducido, con static_image_mode=True. Solo se usa
+#                    cuando no hay mano que seguir, así cada llamada es una detección nueva
+#   hands_recorte:   recorte alrededor de la mano, en modo video. Se reinicia cada vez que
+#                    el recorte se crea o se mueve, porque las marcas anteriores dejan de
+#                    corresponder a la nueva imagen
+class SeguidorMano:
+    def __init__(self, hands_deteccion, hands_recorte, escala_deteccion=0.5, expansion=2.5, lado_minimo=160,
+                 margen=0.15, instrumentacion=None):
+        self.hands_deteccion = hands_deteccion
+        self.hands_recorte = hands_recorte
+        self.instrumentacion = instrumentacion    # Registro opcional de tiempos por etapa
+        self.escala_deteccion = escala_deteccion  # Factor de reducción para la detección
+        # Cuánto se amplía el cuadro de la mano. Cada vez que el recorte se mueve hay que
+        # reiniciar hands_recorte, y mientras el dedo recorre el teclado eso pasa seguido;
+        # un recorte más amplio se mueve menos (ver el contador 'reinicios')
+        self.expansion = expansion
+        self.lado_minimo = lado_minimo            # Lado mínimo del recorte en píxeles
+        self.margen = margen                      # Margen interno antes de mover el recorte
+        self.roi = None                           # (x0, y0, x1, y1) en píxeles del frame completo
+        # Contadores para saber cuánto se usa cada modo
+        self.detecciones = 0      # Frames procesados en modo detección
+        self.seguimientos = 0     # Frames en que la mano se siguió dentro del recorte
+        self.perdidas = 0         # Veces que la mano se perdió dentro del recorte
+        self.reinicios = 0        # Veces que se reinició hands_recorte (recorte nuevo o movido)
+
+    def _procesar(self, hands, img):
+        inicio = time.perf_counter()
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  # Convertir a RGB para MediaPipe
+        convertido = time.perf_counter()
+        result = hands.process(rgb)
+        if self.instrumentacion:
+            self.instrumentacion.registrar("color", convertido - inicio)
+            self.instrumentacion.registrar("hands", time.perf_counter() - convertido)
+        return result
+
+    # --- Procesar un frame BGR completo y devolver marcas en coordenadas del frame ---
+    # escala reemplaza a escala_deteccion en este frame si no hay mano que seguir
+    def procesar(self, img, escala=None):
+        alto, ancho = img.shape[:2]
+
+        # Modo seguimiento: procesar solo el recorte alrededor de la última mano
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            result = self._procesar(self.hands_recorte, img[y0:y1, x0:x1])
+            if result.multi_hand_landmarks:
+                self.seguimientos += 1
+                self._mapear(result.multi_hand_landmarks, x0, y0, x1 - x0, y1 - y0, ancho, alto)
+                self._actualizar_roi(result.multi_hand_landmarks, ancho, alto)
+                return result
+            # Mano perdida: se intenta de nuevo en el frame completo en este mismo frame
+            self.roi = None
+            self.perdidas += 1
+
+        # Modo detección: frame completo reducido (las coordenadas normalizadas no cambian al escalar)
+        self.detecciones += 1
+        escala = self.escala_deteccion if escala is None else escala
+        if escala != 1:
+            img = cv2.resize(img, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+        result = self._procesar(self.hands_deteccion, img)
+        if result.multi_hand_landmarks:
+            self._actualizar_roi(result.multi_hand_landmarks, ancho, alto)
+        return result
+
+    # --- Convertir marcas normalizadas al recorte en marcas normalizadas al frame ---
+    @staticmethod
+    def _mapear(manos, x0, y0, rw, rh, ancho, alto):
+        for hand_landmarks in manos:
+            for lm in hand_landmarks.landmark:
+                lm.x = (x0 + lm.x * rw) / ancho
+                lm.y = (y0 + lm.y * rh) / alto
+                lm.z = lm.z * rw / ancho   # La profundidad está en la escala del ancho de la imagen
+
+    # --- Calcular el recorte cuadrado ampliado alrededor de las manos ---
+    # El recorte solo se mueve cuando la mano se acerca a su borde o cambia mucho de tamaño,
+    # para que el seguimiento interno de MediaPipe vea imágenes estables entre frames
+    def _actualizar_roi(self, manos, ancho, alto):
+        xs = [lm.x * ancho for hand_landmarks in manos for lm in hand_landmarks.landmark]
+        ys = [lm.y * alto for hand_landmarks in manos for lm in hand_landmarks.landmark]
+        bx0, bx1, by0, by1 = min(xs), max(xs), min(ys), max(ys)
+        lado = max(bx1 - bx0, by1 - by0, 1) * self.expansion
+        lado = int(min(max(lado, self.lado_minimo), ancho, alto))
+
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            m = (x1 - x0) * self.margen
+            dentro = x0 + m <= bx0 and bx1 <= x1 - m and y0 + m <= by0 and by1 <= y1 - m
+            if dentro and 0.7 <= lado / (x1 - x0) <= 1.3:
+                return
+
+        cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+        x0 = int(min(max(cx - lado / 2, 0), ancho - lado))
+        y0 = int(min(max(cy - lado / 2, 0), alto - lado))
+        self.roi = (x0, y0, x0 + lado, y0 + lado)
+        self.hands_recorte.reset()      # El recorte cambió: olvidar las marcas del anterior
+        self.reinicios += 1
+
+    # --- Contadores de uso de cada modo ---
+    def contadores(self):
+        return {
+            "detecciones": self.detecciones,
+            "seguimientos": self.seguimientos,
+            "perdidas": self.perdidas,
+            "reinicios": self.reinicios,
+        }
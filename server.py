@@ -1,41 +1,252 @@
 # --- Importar bibliotecas necesarias ---
-import tensorflow as tf
-import numpy as np
-import pickle
+import argparse          # Biblioteca para leer argumentos de línea de comandos
+import asyncio           # Biblioteca para el servidor asíncrono
+import json              # Biblioteca para el protocolo de mensajes (una línea JSON por mensaje)
+from concurrent.futures import ThreadPoolExecutor  # Hilo dedicado para ejecutar el modelo
+from inferencia import cargar_modelo, SesionInferencia, CompletadorPalabras  # Inferencia LSTM con NumPy
 
-# --- Cargar modelo LSTM entrenado y mapas de caracteres ---
-# Se carga el modelo previamente guardado que predice el siguiente carácter en una secuencia
-model = tf.keras.models.load_model('model/autocomplete_lstm.h5')
+# Rutas del modelo LSTM entrenado y de los mapas de caracteres
+PATH_MODELO = 'model/autocomplete_lstm.h5'
+PATH_MAPAS = 'model/char_maps.pkl'
+
+# Modelo, mapas de caracteres y sesión incremental; se cargan en la primera predicción
+modelo = char2idx = idx2char = sesion = None
 
-# Cargar los diccionarios de conversión y la longitud máxima de secuencia
-with open('model/char_maps.pkl', 'rb') as f:
-    char2idx, idx2char, maxlen = pickle.load(f)
+# --- Cargar modelo LSTM entrenado y mapas de caracteres ---
+# Se leen los pesos del modelo previamente guardado que predice el siguiente carácter en una
+# secuencia, junto con los diccionarios de conversión y la longitud máxima de secuencia
+def cargar():
+    global modelo, char2idx, idx2char, sesion
+    if modelo is None:
+        modelo, char2idx, idx2char = cargar_modelo(PATH_MODELO, PATH_MAPAS)
+        # Sesión incremental: conserva el estado de la LSTM entre llamadas, así cada carácter
+        # nuevo avanza un solo paso en lugar de recorrer de nuevo toda la secuencia
+        sesion = SesionInferencia(modelo, char2idx)
+    return modelo, char2idx, idx2char
 
 # --- Función para predecir el siguiente carácter dado un texto parcial ---
 def predict_next_char(text):
+    cargar()
     text = text.lower()  # Convertir a minúsculas para mantener coherencia con el entrenamiento
 
-    # Convertir cada carácter del texto a su índice correspondiente
-    # Si el carácter no está en el diccionario, se usa 0 (padding)
-    seq = [char2idx.get(c, 0) for c in text]
-
-    # Aplicar padding para que la secuencia tenga longitud igual a maxlen
-    seq_padded = tf.keras.preprocessing.sequence.pad_sequences([seq], maxlen=maxlen)
-
-    # Realizar predicción con el modelo cargado
-    preds = model.predict(seq_padded, verbose=0)[0]
+    # Ajustar la sesión al texto: se reutiliza el prefijo común con la llamada anterior
+    # y solo se avanzan (o retroceden) los caracteres que cambiaron
+    sesion.sincronizar(text)
 
     # Obtener el índice con la mayor probabilidad (carácter más probable)
-    next_char_idx = np.argmax(preds)
+    next_char_idx = sesion.siguiente_indice()
 
     # Mapear el índice de vuelta a su carácter correspondiente
     next_char = idx2char.get(next_char_idx, '')
 
     return next_char
 
-# --- Ejemplo interactivo de uso ---
-# Permite al usuario ingresar texto parcial y obtener una sugerencia de siguiente carácter
+
+# --- Predictor que atiende un lote de peticiones con el modelo LSTM ---
+# Cada petición es un diccionario con 'tipo' ('siguiente' o 'completar'), 'texto' y opcionalmente 'k'
+class PredictorLSTM:
+    def __init__(self, modelo, char2idx, idx2char):
+        self.char2idx = char2idx
+        self.idx2char = idx2char
+        self.modelo = modelo
+        self.completador = CompletadorPalabras(modelo, char2idx, idx2char)
+
+    def procesar_lote(self, peticiones):
+        resultados = [None] * len(peticiones)
+
+        # Todas las peticiones de siguiente carácter se resuelven en una sola pasada por lotes
+        siguientes = [i for i, p in enumerate(peticiones) if p["tipo"] == "siguiente"]
+        if siguientes:
+            secuencias = [[self.char2idx.get(c, 0) for c in peticiones[i]["texto"].lower()] for i in siguientes]
+            probs = self.modelo.predecir_lote(secuencias)
+            for i, fila in zip(siguientes, probs):
+                resultados[i] = self.idx2char.get(int(fila.argmax()), '')
+
+        # Las completaciones del lote avanzan juntas en la búsqueda en haz (una llamada al
+        # modelo por paso para todas) y comparten la caché del completador
+        completar = [i for i, p in enumerate(peticiones) if p["tipo"] == "completar"]
+        if completar:
+            consultas = [(peticiones[i]["texto"], peticiones[i].get("k", 3)) for i in completar]
+            try:
+                for i, resultado in zip(completar, self.completador.completar_lote(consultas)):
+                    resultados[i] = resultado
+            except Exception:
+                # Un error en una petición solo se devuelve a esa petición, no al resto del lote
+                for i, (texto, k) in zip(completar, consultas):
+                    try:
+                        resultados[i] = self.completador.completar(texto, k)
+                    except Exception as e:
+                        resultados[i] = e
+
+        for i, p in enumerate(peticiones):
+            if p["tipo"] not in ("siguiente", "completar"):
+                resultados[i] = ValueError(f"Tipo de petición desconocido: {p['tipo']}")
+        return resultados
+
+
+# --- Predictor que carga el modelo la primera vez que se necesita ---
+# Así el servidor abre el socket enseguida. La carga corre en el hilo del modelo, de modo
+# que las primeras peticiones simplemente esperan detrás de ella
+class PredictorDiferido:
+    def __init__(self):
+        self.predictor = None
+
+    def preparar(self):
+        if self.predictor is None:
+            self.predictor = PredictorLSTM(*cargar())
+        return self.predictor
+
+    def procesar_lote(self, peticiones):
+        return self.preparar().procesar_lote(peticiones)
+
+
+# --- Agrupador dinámico de peticiones (micro-batching) ---
+# Las peticiones concurrentes se encolan; un único trabajador junta hasta 'max_lote'
+# peticiones o espera como mucho 'max_espera' segundos desde la primera, ejecuta el
+# lote en un hilo aparte (para no bloquear el bucle de eventos) y reparte los resultados
+class Loteador:
+    def __init__(self, predictor, max_lote=32, max_espera=0.005):
+        self.predictor = predictor
+        self.max_lote = max_lote
+        self.max_espera = max_espera
+        self.cola = asyncio.Queue()
+        # Un solo hilo: el modelo y la caché del completador no se comparten entre hilos
+        self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="modelo")
+        self.lotes = 0           # Lotes ejecutados
+        self.atendidas = 0       # Peticiones atendidas
+        self._tarea = None
+
+    def iniciar(self):
+        self._tarea = asyncio.get_running_loop().create_task(self._trabajar())
+        return self
+
+    async def detener(self):
+        if self._tarea:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+        self.ejecutor.shutdown(wait=False)
+
+    # --- Encolar una petición y esperar su resultado ---
+    async def predecir(self, peticion):
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((peticion, futuro))
+        return await futuro
+
+    async def _trabajar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.cola.get()]
+            limite = loop.time() + self.max_espera
+            while len(lote) < self.max_lote:
+                restante = limite - loop.time()
+                try:
+                    lote.append(self.cola.get_nowait() if restante <= 0 else
+                                await asyncio.wait_for(self.cola.get(), restante))
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+
+            peticiones = [p for p, _ in lote]
+            try:
+                resultados = await loop.run_in_executor(self.ejecutor, self.predictor.procesar_lote, peticiones)
+            except Exception as e:
+                resultados = [e] * len(lote)
+            self.lotes += 1
+            self.atendidas += len(lote)
+
+            for (_, futuro), resultado in zip(lote, resultados):
+                if futuro.done():
+                    continue     # El cliente ya se desconectó
+                if isinstance(resultado, Exception):
+                    futuro.set_exception(resultado)
+                else:
+                    futuro.set_result(resultado)
+
+
+# --- Atender una conexión: una línea JSON por petición y una por respuesta ---
+# Petición:  {"id": 1, "tipo": "siguiente" | "completar", "texto": "hol", "k": 3}
+# Respuesta: {"id": 1, "resultado": ...} o {"id": 1, "error": "..."}
+# Un cliente puede enviar varias peticiones sin esperar; las respuestas llevan su id
+async def atender_cliente(loteador, reader, writer):
+    pendientes = set()
+
+    async def responder(peticion):
+        try:
+            respuesta = {"id": peticion.get("id"), "resultado": await loteador.predecir(peticion)}
+        except Exception as e:
+            respuesta = {"id": peticion.get("id"), "error": str(e)}
+        writer.write((json.dumps(respuesta, ensure_ascii=False) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    try:
+        while linea := await reader.readline():
+            try:
+                peticion = json.loads(linea)
+                peticion["texto"] = str(peticion.get("texto", ""))
+                peticion.setdefault("tipo", "siguiente")
+            except (ValueError, AttributeError):
+                writer.write(b'{"id": null, "error": "JSON invalido"}\n')
+                continue
+            # k debe ser un entero positivo; se valida aquí para que nunca llegue al lote
+            k = peticion.get("k", 3)
+            if not isinstance(k, int) or isinstance(k, bool) or k < 1:
+                respuesta = {"id": peticion.get("id"), "error": f"k debe ser un entero positivo, se recibió {k!r}"}
+                writer.write((json.dumps(respuesta, ensure_ascii=False) + "\n").encode("utf-8"))
+                continue
+            tarea = asyncio.create_task(responder(peticion))
+            pendientes.add(tarea)
+            tarea.add_done_callback(pendientes.discard)
+        if pendientes:
+            await asyncio.gather(*pendientes, return_exceptions=True)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+# --- Iniciar el servidor en un socket local ---
+async def iniciar_servidor(predictor, host="127.0.0.1", port=8765, max_lote=32, max_espera=0.005):
+    loteador = Loteador(predictor, max_lote, max_espera).iniciar()
+    servidor = await asyncio.start_server(lambda r, w: atender_cliente(loteador, r, w), host, port)
+    return servidor, loteador
+
+
+async def servir(args):
+    predictor = PredictorDiferido()        # El modelo se carga una vez y queda en memoria
+    servidor, loteador = await iniciar_servidor(predictor, args.host, args.port, args.max_lote, args.max_espera_ms / 1000)
+    print(f"Servidor de autocompletado escuchando en {args.host}:{args.port}")
+
+    # Cargar el modelo en segundo plano mientras el socket ya acepta conexiones
+    def informar(carga):
+        if carga.exception():
+            print(f"No se pudo cargar el modelo ({carga.exception()}); se reintentará con cada lote.")
+        else:
+            print("Modelo de autocompletado cargado")
+    carga = asyncio.get_running_loop().run_in_executor(loteador.ejecutor, predictor.preparar)
+    carga.add_done_callback(informar)
+    async with servidor:
+        await servidor.serve_forever()
+
+
 if __name__ == "__main__":
-    texto_entrada = input("Escribe el texto parcial: ")
-    sugerencia = predict_next_char(texto_entrada)
-    print(f"Siguiente caracter sugerido: '{sugerencia}'")
+    parser = argparse.ArgumentParser(description="Servidor de predicción de autocompletado")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-lote", type=int, default=32, help="Máximo de peticiones por lote")
+    parser.add_argument("--max-espera-ms", type=float, default=5.0, help="Espera máxima para completar un lote")
+    parser.add_argument("--interactivo", action="store_true", help="Predecir un solo texto leído de la consola")
+    args = parser.parse_args()
+
+    if args.interactivo:
+        # --- Ejemplo interactivo de uso ---
+        # Permite al usuario ingresar texto parcial y obtener una sugerencia de siguiente carácter
+        texto_entrada = input("Escribe el texto parcial: ")
+        sugerencia = predict_next_char(texto_entrada)
+        print(f"Siguiente caracter sugerido: '{sugerencia}'")
+    else:
+        try:
+            asyncio.run(servir(args))
+        except KeyboardInterrupt:
+            pass
@@ -1,25 +1,26 @@
 import cv2               # Biblioteca para procesamiento de imágenes y video
-import mediapipe as mp   # Biblioteca para detección y seguimiento de manos
-import pyautogui         # Biblioteca para controlar el teclado y mouse del sistema
 import time              # Biblioteca para manejo de tiempo y temporizadores
 import math              # Biblioteca para funciones matemáticas (distancia)
-import pygame            # Biblioteca para manejo de audio y multimedia
-import re                # Biblioteca para expresiones regulares
-
-# Inicializar pygame para reproducir sonido
-pygame.init()
-click_sound = pygame.mixer.Sound("click.wav")  # Cargar archivo de sonido para click
+import threading         # Biblioteca para cargar cámara y modelo en segundo plano
+import numpy as np       # Biblioteca para el frame de espera mientras abre la cámara
+from vocabulario import cargar_vocabulario  # Índice de prefijos para autocompletado
+from capa_teclado import CapaTeclado        # Teclado pre-renderizado y detección de teclas
+from pipeline import PipelineCamara         # Captura y seguimiento en hilos separados
+from seguimiento import SeguidorMano        # Seguimiento de mano por región de interés
+from salida import ColaTeclas               # Envío de pulsaciones al sistema en un hilo aparte
+from metricas import Instrumentacion        # Tiempos por etapa y panel de latencias
+from reposo import PlanificadorReposo       # Detección y dibujo reducidos cuando no hay mano
 
 # Definir resolución deseada para captura de cámara
 w, h = 1280, 720
-cap = cv2.VideoCapture(0)    # Abrir cámara por defecto (índice 0)
-cap.set(3, w)                # Establecer ancho del frame
-cap.set(4, h)                # Establecer alto del frame
 
-# Configurar MediaPipe Hands para detectar una mano con confianza mínima 0.8
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.8)
-mp_draw = mp.solutions.drawing_utils  # Utilidad para dibujar puntos y conexiones
+# Modo pipeline: captura, seguimiento de mano e interfaz corren en hilos distintos.
+# Con False se ejecuta todo secuencialmente en un solo hilo como antes
+usar_pipeline = True
+
+# Modo región de interés: detectar sobre el frame reducido y luego seguir la mano
+# procesando solo un recorte a su alrededor. Con False se procesa el frame completo
+usar_roi = True
 
 # Definición del teclado en filas con caracteres
 keys = [
@@ -36,180 +37,404 @@ start_x, start_y = 100, 50     # Coordenadas iniciales para el teclado
 x_spacing = 30                 # Espacio horizontal entre teclas
 y_spacing = 30                 # Espacio vertical entre filas
 
-# Variables para almacenar el texto ingresado y control de tiempos
-texto_escrito = ""             # Texto que el usuario ha escrito
-last_pressed = ""              # Última tecla detectada como presionada
-last_time = 0                 # Tiempo de la última pulsación
 click_threshold = 40           # Distancia mínima para detectar un click entre dedos
+pred_interval = 0.5            # Tiempo mínimo entre sugerencias (en segundos)
 
-# --- Función para cargar vocabulario desde un archivo de texto ---
-def cargar_vocabulario(path="spanish_corpus.txt", min_len=3, max_len=15):
-    vocab = set()  # Usamos conjunto para evitar palabras repetidas
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            for linea in f:
-                # Extraemos palabras que contengan solo letras y caracteres especiales del español
-                palabras = re.findall(r'\b[a-zA-ZáéíóúüñÁÉÍÓÚÜÑ]+\b', linea.lower())
-                for p in palabras:
-                    # Solo agregamos palabras que estén dentro del rango de longitud permitido
-                    if min_len <= len(p) <= max_len:
-                        vocab.add(p)
-    except FileNotFoundError:
-        print(f"Archivo {path} no encontrado. Usando vocabulario vacío.")
-    return sorted(vocab)  # Devolvemos vocabulario ordenado
-
-# Cargar el vocabulario para autocompletado
-vocabulario = cargar_vocabulario()
-
-# Variables para autocompletado y control de sugerencias
-sugerencia = ""               # Palabra sugerida por autocompletado
-ultimo_texto = ""             # Último texto escrito para evitar calcular sugerencias repetidas
-last_pred_time = 0            # Última vez que se calculó sugerencia
-pred_interval = 0.5           # Tiempo mínimo entre sugerencias (en segundos)
-
-# --- Función simple de autocompletado ---
-def autocomplete_simple(texto):
-    palabras = texto.strip().lower().split()  # Dividir texto en palabras
-    if not palabras:
-        return ""  # Si no hay palabras, no sugerir nada
-    ultima = palabras[-1]  # Tomar la última palabra escrita
-    if ultima == "":
-        return ""
-    # Buscar en vocabulario palabras que empiecen igual pero no sean exactamente la misma
-    posibles = [p for p in vocabulario if p.startswith(ultima) and p != ultima]
-    if posibles:
-        return posibles[0]  # Devolver la primera coincidencia
-    return ""
-
-# --- Función para dibujar el teclado virtual sobre la imagen ---
-def draw_keyboard(img):
-    key_positions = []  # Lista donde se guardan las posiciones y etiquetas de cada tecla
-    y = start_y
-    for row in keys:
-        x = start_x
-        for key in row:
-            # Dibujar rectángulo relleno para tecla
-            cv2.rectangle(img, (x, y), (x + key_w, y + key_h), (200, 200, 200), -1)
-            # Dibujar borde negro
-            cv2.rectangle(img, (x, y), (x + key_w, y + key_h), (0, 0, 0), 2)
-
-            # Ajustar tamaño de texto según longitud de tecla (una letra o palabra)
-            font_scale = 1.2 if len(key) == 1 else 0.8
-            text_size = cv2.getTextSize(key, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)[0]
-            text_x = x + (key_w - text_size[0]) // 2
-            text_y = y + (key_h + text_size[1]) // 2
-
-            # Poner texto de la tecla en el centro
-            cv2.putText(img, key, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), 2)
-
-            # Guardar posición y etiqueta para detectar colisiones con el dedo
-            key_positions.append((key, x, y))
-            x += key_w + x_spacing
-        y += key_h + y_spacing
-    return key_positions
+# Métricas: instantáneas periódicas de latencias por etapa en JSONL (None para desactivar).
+# La tecla 'm' muestra u oculta el panel de FPS y latencias sobre el video
+path_metricas = "metricas.jsonl"
+intervalo_metricas = 5.0       # Segundos entre instantáneas
+
+# Modo reposo: tras 'tiempo_reposo' segundos sin ver una mano se detecta solo cada
+# 'intervalo_reposo' segundos sobre el frame reducido a 'escala_reposo' y la ventana se
+# redibuja cada 'intervalo_dibujo_reposo' segundos. Con tiempo_reposo = None se desactiva
+tiempo_reposo = 10.0
+intervalo_reposo = 0.25        # También es la espera máxima para volver al modo activo
+escala_reposo = 0.25
+intervalo_dibujo_reposo = 0.5
 
 # --- Función para calcular distancia euclidiana entre dos puntos ---
 def distance(p1, p2):
     return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
 
-# --- Bucle principal para captura y procesamiento ---
-while True:
-    success, img = cap.read()       # Capturar frame de la cámara
-    img = cv2.flip(img, 1)          # Voltear horizontal para espejo
-    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  # Convertir a RGB para MediaPipe
-    result = hands.process(rgb)     # Procesar imagen para detectar manos
-    key_positions = draw_keyboard(img)  # Dibujar teclado en imagen actual
-
-    current_time = time.time()      # Tiempo actual para controlar intervalos
-
-    # Actualizar sugerencia solo si el texto ha cambiado y pasó suficiente tiempo
-    if texto_escrito != ultimo_texto and (current_time - last_pred_time > pred_interval):
-        sugerencia = autocomplete_simple(texto_escrito)
-        ultimo_texto = texto_escrito
-        last_pred_time = current_time
-
-    # Si se detecta al menos una mano
-    if result.multi_hand_landmarks:
-        for hand_landmarks in result.multi_hand_landmarks:
-            lm_list = []
-            # Obtener coordenadas de cada punto clave de la mano
-            for id, lm in enumerate(hand_landmarks.landmark):
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                lm_list.append((cx, cy))
-
-            # Dibujar puntos y conexiones de la mano sobre la imagen
-            mp_draw.draw_landmarks(img, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-            # Si hay suficientes puntos (por seguridad)
-            if len(lm_list) >= 9:
-                index_finger = lm_list[8]  # Punta del dedo índice
-                thumb_tip = lm_list[4]     # Punta del pulgar
-
-                # Dibujar círculo en la punta del dedo índice
-                cv2.circle(img, index_finger, 12, (255, 0, 255), -1)
-
-                # Calcular distancia entre pulgar e índice para detectar gesto de clic
-                d = distance(index_finger, thumb_tip)
-
-                # Verificar si dedo índice está sobre alguna tecla
-                for key, x, y in key_positions:
-                    if x < index_finger[0] < x + key_w and y < index_finger[1] < y + key_h:
-                        # Resaltar tecla seleccionada en verde
-                        cv2.rectangle(img, (x, y), (x + key_w, y + key_h), (0, 255, 0), -1)
-                        cv2.putText(img, key, (x + 25, y + 65), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
-
-                        # Si la distancia entre dedo índice y pulgar es menor que umbral y no es una pulsación repetida rápida
-                        if d < click_threshold and (key != last_pressed or (current_time - last_time > 0.5)):
-                            click_sound.play()  # Reproducir sonido de click
-
-                            # Comportamiento según tecla presionada
-                            if key == "ESPACIO":
-                                pyautogui.press("space")   # Simular barra espaciadora
-                                texto_escrito += " "
-                            elif key == "BORRAR":
-                                if texto_escrito:
-                                    pyautogui.press("backspace")  # Simular retroceso
-                                    texto_escrito = texto_escrito[:-1]
-                            elif key == "COMPLETAR":
-                                # Completar la palabra actual con la sugerencia
-                                if sugerencia:
-                                    palabras = texto_escrito.rstrip().split(" ")
-                                    if palabras:
-                                        ultima_palabra = palabras[-1]
-                                        borrar_len = len(ultima_palabra)
-                                        # Borrar la palabra incompleta con backspaces
-                                        for _ in range(borrar_len):
-                                            pyautogui.press("backspace")
-                                        # Escribir la palabra sugerida completa
-                                        pyautogui.write(sugerencia)
-                                        palabras[-1] = sugerencia
-                                        texto_escrito = " ".join(palabras)
-                                        sugerencia = ""
-                            else:
-                                # Para teclas normales escribir letra en minúscula
-                                pyautogui.write(key.lower())
-                                texto_escrito += key.lower()
-
-                            # Guardar tecla y tiempo de la pulsación actual
-                            last_pressed = key
-                            last_time = current_time
-
-    # Dibujar cuadro blanco para mostrar texto escrito en la parte inferior
-    cv2.rectangle(img, (50, h - 100), (w - 50, h - 40), (255, 255, 255), -1)
-    # Escribir el texto acumulado
-    cv2.putText(img, texto_escrito, (60, h - 55), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
-
-    # Mostrar la sugerencia de autocompletado, si existe
-    if sugerencia:
-        cv2.putText(img, f"Sugerencia: {sugerencia}", (60, h - 15), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 150, 255), 2)
-
-    # Mostrar ventana con la imagen procesada y teclado virtual
-    cv2.imshow("Teclado Virtual con Mano", img)
-
-    # Salir si se presiona la tecla 'q'
-    if cv2.waitKey(1) == ord('q'):
-        break
-
-# Liberar recursos y cerrar ventanas al finalizar
-cap.release()
-cv2.destroyAllWindows()
+# --- Cargar el modelo LSTM para completar palabras ---
+# Si no está disponible se devuelve None y se usa solo el vocabulario
+def cargar_completador():
+    try:
+        from inferencia import cargar_modelo, CompletadorPalabras  # Completado de palabras con el modelo LSTM
+        return CompletadorPalabras(*cargar_modelo())
+    except (ImportError, OSError, KeyError, ValueError) as e:
+        print(f"No se pudo cargar el modelo de autocompletado ({e}). Usando solo el vocabulario.")
+        return None
+
+
+# --- Abrir la cámara e inicializar MediaPipe y el sonido ---
+# Son las partes más lentas del arranque, por eso main() las ejecuta en segundo plano.
+# Devuelve (cámara, MediaPipe Hands en modo video, MediaPipe Hands para detecciones
+# sueltas, función de sonido, función para dibujar la mano)
+def abrir_camara():
+    import mediapipe as mp   # Biblioteca para detección y seguimiento de manos
+    import pygame            # Biblioteca para manejo de audio y multimedia
+
+    # Inicializar solo el audio de pygame para reproducir sonido
+    pygame.mixer.init()
+    click_sound = pygame.mixer.Sound("click.wav")  # Cargar archivo de sonido para click
+
+    cap = cv2.VideoCapture(0)    # Abrir cámara por defecto (índice 0)
+    cap.set(3, w)                # Establecer ancho del frame
+    cap.set(4, h)                # Establecer alto del frame
+
+    # Configurar MediaPipe Hands para detectar una mano con confianza mínima 0.8
+    mp_hands = mp.solutions.hands
+    hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.8)
+    # Detección sobre el frame completo reducido, sin arrastrar marcas de frames anteriores
+    hands_deteccion = mp_hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.8)
+    mp_draw = mp.solutions.drawing_utils  # Utilidad para dibujar puntos y conexiones
+
+    def dibujar_mano(img, hand_landmarks):
+        mp_draw.draw_landmarks(img, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+
+    return cap, hands, hands_deteccion, click_sound.play, dibujar_mano
+
+
+# --- Carga en segundo plano ---
+# Ejecuta una función en otro hilo y guarda su resultado (o la excepción que lanzó)
+class CargaFondo(threading.Thread):
+    def __init__(self, nombre, funcion):
+        super().__init__(name=nombre, daemon=True)
+        self.funcion = funcion
+        self.resultado = None
+        self.error = None
+        self.listo = threading.Event()
+
+    def iniciar(self):
+        self.start()
+        return self
+
+    def run(self):
+        try:
+            self.resultado = self.funcion()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.listo.set()
+
+
+# --- Lógica del teclado virtual para un frame ---
+# Reúne el estado (texto escrito, sugerencia, última pulsación) y todo lo que se hace
+# en cada frame una vez detectada la mano: dibujar teclado, autocompletar, detectar la
+# tecla bajo el dedo, el gesto de clic y escribir. No depende de la cámara ni de la
+# ventana, así que se puede ejecutar sin interfaz (ver benchmark.py)
+class TecladoVirtual:
+    def __init__(self, vocabulario, completador=None, salida=None, sonido=None, dibujar_mano=None,
+                 instrumentacion=None):
+        self.vocabulario = vocabulario      # Índice de prefijos para autocompletado
+        self.completador = completador      # Completado con el modelo LSTM (opcional)
+        self.salida = salida                # Destino de las pulsaciones (escribir / borrar)
+        self.sonido = sonido                # Función que reproduce el sonido de click (opcional)
+        self.dibujar_mano = dibujar_mano    # Función (img, hand_landmarks) para dibujar la mano (opcional)
+
+        # Capa del teclado: se dibuja una vez y solo se reconstruye si cambia la distribución
+        self.capa_teclado = CapaTeclado(keys, key_w, key_h, start_x, start_y, x_spacing, y_spacing)
+
+        # Variables para almacenar el texto ingresado y control de tiempos
+        self.texto_escrito = ""             # Texto que el usuario ha escrito
+        self.last_pressed = ""              # Última tecla detectada como presionada
+        self.last_time = 0                  # Tiempo de la última pulsación
+
+        # Variables para autocompletado y control de sugerencias
+        self.sugerencia = ""                # Palabra sugerida por autocompletado
+        self.ultimo_texto = ""              # Último texto escrito para evitar calcular sugerencias repetidas
+        self.last_pred_time = 0             # Última vez que se calculó sugerencia
+
+        # Tiempos por etapa de cada frame
+        self.instrumentacion = instrumentacion or Instrumentacion()
+        self.frames = 0
+
+    # --- Función simple de autocompletado ---
+    def autocomplete_simple(self, texto):
+        palabras = texto.strip().lower().split()  # Dividir texto en palabras
+        if not palabras:
+            return ""  # Si no hay palabras, no sugerir nada
+        ultima = palabras[-1]  # Tomar la última palabra escrita
+        if ultima == "":
+            return ""
+        # Preferir la completación más probable del modelo que sea una palabra conocida
+        if self.completador:
+            for palabra, _ in self.completador.completar(ultima, k=3):
+                if palabra in self.vocabulario:
+                    return palabra
+        # Buscar en el índice la palabra más frecuente que empiece igual pero no sea exactamente la misma
+        posibles = self.vocabulario.completar(ultima, k=1)
+        if posibles:
+            return posibles[0]  # Devolver la mejor coincidencia
+        return ""
+
+    # --- Procesar un frame: dibuja sobre img y envía las pulsaciones detectadas ---
+    # result es el resultado de MediaPipe Hands (o None), current_time el instante del frame
+    # y origen el instante monotónico de captura del frame del que salieron las marcas
+    def procesar_frame(self, img, result, current_time, origen=None):
+        alto, ancho = img.shape[:2]
+        self.frames += 1
+        inst = self.instrumentacion
+
+        t0 = time.perf_counter()
+        self.capa_teclado.componer(img)      # Superponer el teclado pre-renderizado
+        t1 = time.perf_counter()
+        inst.registrar("teclado", t1 - t0)
+
+        # Actualizar sugerencia solo si el texto ha cambiado y pasó suficiente tiempo
+        if self.texto_escrito != self.ultimo_texto and (current_time - self.last_pred_time > pred_interval):
+            self.sugerencia = self.autocomplete_simple(self.texto_escrito)
+            self.ultimo_texto = self.texto_escrito
+            self.last_pred_time = current_time
+        t2 = time.perf_counter()
+        inst.registrar("autocompletado", t2 - t1)
+
+        # Si se detecta al menos una mano
+        if result is not None and result.multi_hand_landmarks:
+            for hand_landmarks in result.multi_hand_landmarks:
+                self._procesar_mano(img, hand_landmarks, ancho, alto, current_time, origen)
+        t3 = time.perf_counter()
+        inst.registrar("mano", t3 - t2)
+
+        # Dibujar cuadro blanco para mostrar texto escrito en la parte inferior
+        cv2.rectangle(img, (50, alto - 100), (ancho - 50, alto - 40), (255, 255, 255), -1)
+        # Escribir el texto acumulado
+        cv2.putText(img, self.texto_escrito, (60, alto - 55), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+
+        # Mostrar la sugerencia de autocompletado, si existe
+        if self.sugerencia:
+            cv2.putText(img, f"Sugerencia: {self.sugerencia}", (60, alto - 15), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 150, 255), 2)
+        inst.registrar("texto", time.perf_counter() - t3)
+
+    # --- Tecla bajo el dedo índice y gesto de clic para una mano ---
+    def _procesar_mano(self, img, hand_landmarks, ancho, alto, current_time, origen):
+        lm_list = []
+        # Obtener coordenadas de cada punto clave de la mano
+        for lm in hand_landmarks.landmark:
+            cx, cy = int(lm.x * ancho), int(lm.y * alto)
+            lm_list.append((cx, cy))
+
+        # Dibujar puntos y conexiones de la mano sobre la imagen
+        if self.dibujar_mano:
+            self.dibujar_mano(img, hand_landmarks)
+
+        # Si no hay suficientes puntos (por seguridad) no se puede detectar nada
+        if len(lm_list) < 9:
+            return
+        index_finger = lm_list[8]  # Punta del dedo índice
+        thumb_tip = lm_list[4]     # Punta del pulgar
+
+        # Dibujar círculo en la punta del dedo índice
+        cv2.circle(img, index_finger, 12, (255, 0, 255), -1)
+
+        # Calcular distancia entre pulgar e índice para detectar gesto de clic
+        d = distance(index_finger, thumb_tip)
+
+        # Verificar si dedo índice está sobre alguna tecla consultando la rejilla precalculada
+        tecla = self.capa_teclado.tecla_en(index_finger)
+        if tecla is None:
+            return
+        key = tecla[0]
+        # Resaltar tecla seleccionada en verde
+        self.capa_teclado.resaltar(img, tecla)
+
+        # Si la distancia entre dedo índice y pulgar es menor que umbral y no es una pulsación repetida rápida
+        if d < click_threshold and (key != self.last_pressed or (current_time - self.last_time > 0.5)):
+            if self.sonido:
+                self.sonido()  # Reproducir sonido de click
+            self.pulsar(key, origen)
+
+            # Guardar tecla y tiempo de la pulsación actual
+            self.last_pressed = key
+            self.last_time = current_time
+
+    # --- Comportamiento según tecla presionada ---
+    def pulsar(self, key, origen=None):
+        if key == "ESPACIO":
+            self.salida.escribir(" ", origen)   # Simular barra espaciadora
+            self.texto_escrito += " "
+        elif key == "BORRAR":
+            if self.texto_escrito:
+                self.salida.borrar(1, origen)  # Simular retroceso
+                self.texto_escrito = self.texto_escrito[:-1]
+        elif key == "COMPLETAR":
+            # Completar la palabra actual con la sugerencia
+            if self.sugerencia:
+                palabras = self.texto_escrito.rstrip().split(" ")
+                if palabras:
+                    ultima_palabra = palabras[-1]
+                    # Se borran también los espacios finales que quita rstrip,
+                    # así el texto enviado coincide con texto_escrito
+                    borrar_len = len(ultima_palabra) + len(self.texto_escrito) - len(self.texto_escrito.rstrip())
+                    # Borrar la palabra incompleta con backspaces (se envían en una sola llamada)
+                    self.salida.borrar(borrar_len, origen)
+                    # Escribir la palabra sugerida completa
+                    self.salida.escribir(self.sugerencia, origen)
+                    palabras[-1] = self.sugerencia
+                    self.texto_escrito = " ".join(palabras)
+                    self.sugerencia = ""
+        else:
+            # Para teclas normales escribir letra en minúscula
+            self.salida.escribir(key.lower(), origen)
+            self.texto_escrito += key.lower()
+
+
+# --- Programa principal con cámara y ventana ---
+# La ventana aparece enseguida: la cámara, MediaPipe y el modelo se cargan en segundo
+# plano y mientras tanto se muestra el teclado y se autocompleta solo con el vocabulario
+def main():
+    inicio = time.perf_counter()
+    titulo = "Teclado Virtual con Mano"
+    carga_camara = CargaFondo("camara", abrir_camara).iniciar()
+    carga_modelo = CargaFondo("modelo", cargar_completador).iniciar()
+
+    # Instrumentación compartida por todas las etapas (captura, seguimiento, dibujo y salida)
+    inst = Instrumentacion(path_jsonl=path_metricas, intervalo_exportar=intervalo_metricas)
+
+    # Cola de salida: las pulsaciones se envían al sistema desde otro hilo para no frenar el video.
+    # texto_escrito se actualiza en el teclado mismo, así siempre refleja lo que se va a escribir
+    salida = ColaTeclas(instrumentacion=inst)
+    inst.agregar_contadores("salida", salida.contadores)
+
+    # El vocabulario se lee del índice compilado; el completador LSTM se agrega cuando termine de cargar
+    teclado = TecladoVirtual(cargar_vocabulario(), salida=salida, instrumentacion=inst)
+    esperando_modelo = True
+
+    # --- Usar el modelo en cuanto esté cargado ---
+    def revisar_modelo():
+        nonlocal esperando_modelo
+        if esperando_modelo and carga_modelo.listo.is_set():
+            esperando_modelo = False
+            teclado.completador = carga_modelo.resultado
+            teclado.ultimo_texto = None      # Recalcular la sugerencia con el modelo
+            if carga_modelo.resultado:
+                print(f"Modelo de autocompletado listo en {time.perf_counter() - inicio:.2f} s")
+                inst.agregar_contadores("completador", carga_modelo.resultado.contadores)
+
+    # --- Pantalla de espera: teclado sobre fondo negro hasta que la cámara esté lista ---
+    primer_frame = True
+    while not carga_camara.listo.wait(0.01):
+        revisar_modelo()
+        img = np.zeros((h, w, 3), np.uint8)
+        teclado.procesar_frame(img, None, time.time())
+        cv2.putText(img, "Abriendo camara...", (start_x, h - 120), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        cv2.imshow(titulo, img)
+        if primer_frame:
+            print(f"Ventana lista en {time.perf_counter() - inicio:.2f} s")
+            primer_frame = False
+        if cv2.waitKey(15) == ord('q'):
+            salida.detener()
+            cv2.destroyAllWindows()
+            return
+    if carga_camara.error:
+        salida.detener()
+        cv2.destroyAllWindows()
+        raise carga_camara.error
+    cap, hands, hands_deteccion, teclado.sonido, teclado.dibujar_mano = carga_camara.resultado
+
+    # hands sigue la mano dentro del recorte, o en el frame completo si no se usa ROI
+    seguidor = SeguidorMano(hands_deteccion, hands, escala_deteccion=0.5, instrumentacion=inst)
+    planificador = PlanificadorReposo(
+        float("inf") if tiempo_reposo is None else tiempo_reposo,
+        intervalo_reposo, escala_reposo, intervalo_dibujo_reposo)
+    inst.agregar_contadores("reposo", planificador.resumen)
+    if usar_roi:
+        inst.agregar_contadores("seguimiento", seguidor.contadores)
+
+    # --- Función para detectar la mano en un frame BGR ---
+    # En modo reposo devuelve None en los frames en que no toca detectar
+    def detectar_mano(img):
+        ahora = time.monotonic()
+        if not planificador.debe_detectar(ahora):
+            return None
+        escala = planificador.escala_actual()       # Frame más reducido en reposo
+        if usar_roi:
+            result = seguidor.procesar(img, escala) # Recorte o frame reducido según haya mano
+        else:
+            if escala:
+                img = cv2.resize(img, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+            with inst.etapa("color"):
+                rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  # Convertir a RGB para MediaPipe
+            with inst.etapa("hands"):
+                result = hands.process(rgb)         # Procesar imagen para detectar manos
+        planificador.registrar_deteccion(bool(result.multi_hand_landmarks), ahora)
+        return result
+
+    # Iniciar los hilos de captura y seguimiento si se usa el modo pipeline. En reposo el hilo
+    # de captura solo decodifica y publica los frames que toca detectar o dibujar
+    pipeline = None
+    if usar_pipeline:
+        pipeline = PipelineCamara(
+            cap, detectar_mano, instrumentacion=inst,
+            necesita_frame=lambda: planificador.debe_detectar() or planificador.debe_dibujar()).iniciar()
+        inst.agregar_contadores("pipeline", pipeline.contadores)
+
+    # --- Bucle principal para captura y procesamiento ---
+    primer_frame = True
+    while True:
+        inicio_frame = time.perf_counter()
+        revisar_modelo()
+        if pipeline:
+            # Tomar el frame más reciente y las últimas marcas de la mano calculadas en paralelo.
+            # Si en reposo no toca dibujar, el frame se consume sin copiarlo
+            dibujar = planificador.debe_dibujar()
+            with inst.etapa("espera_frame"):
+                frame = pipeline.siguiente(timeout=0.1, copiar=dibujar)
+            if frame is None:
+                if cv2.waitKey(1) == ord('q'):
+                    break
+                continue
+            img, t_captura, result, t_resultado = frame
+        elif planificador.debe_detectar() or planificador.debe_dibujar():
+            with inst.etapa("captura"):
+                success, img = cap.read()   # Capturar frame de la cámara
+            t_resultado = time.monotonic()
+            with inst.etapa("voltear"):
+                img = cv2.flip(img, 1)      # Voltear horizontal para espejo
+            result = detectar_mano(img)     # Procesar imagen para detectar manos
+            dibujar = planificador.debe_dibujar()   # Si apareció una mano ya se volvió al modo activo
+        else:
+            cap.grab()                      # En reposo: descartar el frame sin decodificarlo
+            dibujar = False
+
+        if dibujar:
+            teclado.procesar_frame(img, result, time.time(), t_resultado)
+            inst.dibujar(img)               # Panel de FPS y latencias (si está activado)
+
+            # Mostrar ventana con la imagen procesada y teclado virtual
+            with inst.etapa("mostrar"):
+                cv2.imshow(titulo, img)
+                tecla = cv2.waitKey(1)
+            planificador.registrar_dibujo()
+            if primer_frame:
+                print(f"Primer frame de la cámara en {time.perf_counter() - inicio:.2f} s")
+                primer_frame = False
+            inst.registrar("frame", time.perf_counter() - inicio_frame)
+            inst.marcar_frame()
+        else:
+            # Sin mano y sin redibujo pendiente: solo atender el teclado
+            planificador.registrar_omitido()
+            tecla = cv2.waitKey(1)
+        inst.exportar_si_toca()
+
+        # Salir si se presiona la tecla 'q'; 'm' muestra u oculta el panel de métricas
+        if tecla == ord('q'):
+            break
+        if tecla == ord('m'):
+            inst.mostrar_panel = not inst.mostrar_panel
+
+    # Liberar recursos y cerrar ventanas al finalizar
+    if pipeline:
+        pipeline.detener()
+    salida.detener()
+    inst.exportar_si_toca(forzar=True)
+    segundos = planificador.resumen()["segundos"]
+    print(f"Tiempo en modo activo {segundos['activo']:.1f} s, en reposo {segundos['reposo']:.1f} s")
+    cap.release()
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import os                # Biblioteca para consultar el archivo del corpus y reemplazar el índice
+import re                # Biblioteca para expresiones regulares
+import heapq             # Biblioteca para seleccionar los k elementos mayores
+import mmap              # Biblioteca para mapear el índice compilado en memoria
+import struct            # Biblioteca para la cabecera del índice compilado
+from array import array  # Arreglos compactos de enteros para escribir el índice
+from bisect import bisect_left   # Búsqueda binaria entre los hijos de un nodo
+from collections import Counter, deque  # Contador de frecuencias y cola del recorrido por niveles
+
+# Expresión regular para extraer palabras con letras del español
+patron_palabra = re.compile(r'\b[a-zA-ZáéíóúüñÁÉÍÓÚÜÑ]+\b')
+
+
+# --- Nodo del árbol de prefijos (trie) ---
+# Cada nodo guarda sus hijos por carácter y la lista precalculada de las
+# mejores palabras (más frecuentes) que empiezan con el prefijo del nodo
+class NodoPrefijo:
+    __slots__ = ("hijos", "mejores")
+
+    def __init__(self):
+        self.hijos = {}      # Carácter -> NodoPrefijo
+        self.mejores = ()    # Tupla de (palabra, frecuencia) ordenada por relevancia
+
+
+# --- Índice de prefijos con frecuencias ---
+# Permite obtener las k palabras más frecuentes que empiezan con un prefijo
+# recorriendo solo tantos nodos como caracteres tenga el prefijo
+class IndicePrefijos:
+    def __init__(self, frecuencias, max_k=5):
+        # Se guarda una sugerencia extra por nodo porque la propia palabra
+        # del prefijo se descarta al consultar
+        self.max_k = max_k
+        self.frecuencias = dict(frecuencias)
+        self.raiz = NodoPrefijo()
+        for palabra in self.frecuencias:
+            nodo = self.raiz
+            for c in palabra:
+                hijo = nodo.hijos.get(c)
+                if hijo is None:
+                    hijo = nodo.hijos[c] = NodoPrefijo()
+                nodo = hijo
+        self._calcular_mejores(self.raiz, "")
+
+    # Orden de relevancia: mayor frecuencia primero y, en empate, orden alfabético
+    @staticmethod
+    def _clave(item):
+        return (-item[1], item[0])
+
+    # Recorrido en postorden (iterativo para no agotar la pila con palabras largas)
+    # que combina las mejores palabras de los hijos con la palabra del propio nodo
+    def _calcular_mejores(self, raiz, prefijo_raiz):
+        limite = self.max_k + 1
+        pila = [(raiz, prefijo_raiz, False)]
+        while pila:
+            nodo, prefijo, visitado = pila.pop()
+            if not visitado:
+                pila.append((nodo, prefijo, True))
+                for c, hijo in nodo.hijos.items():
+                    pila.append((hijo, prefijo + c, False))
+                continue
+            candidatos = [item for hijo in nodo.hijos.values() for item in hijo.mejores]
+            if prefijo in self.frecuencias:
+                candidatos.append((prefijo, self.frecuencias[prefijo]))
+            nodo.mejores = tuple(heapq.nsmallest(limite, candidatos, key=self._clave))
+
+    def __len__(self):
+        return len(self.frecuencias)
+
+    def __contains__(self, palabra):
+        return palabra in self.frecuencias
+
+    # --- Devolver las k palabras más frecuentes que empiezan con el prefijo ---
+    # No se incluye la palabra idéntica al prefijo porque no completa nada.
+    # Cada nodo guarda solo max_k sugerencias, así que k no puede ser mayor que max_k
+    def completar(self, prefijo, k=1):
+        if k > self.max_k:
+            raise ValueError(f"k={k} supera max_k={self.max_k}; construir el índice con un max_k mayor")
+        nodo = self.raiz
+        for c in prefijo:
+            nodo = nodo.hijos.get(c)
+            if nodo is None:
+                return []
+        return [p for p, _ in nodo.mejores if p != prefijo][:k]
+
+
+# --- Índice compilado en disco ---
+# El mismo árbol de prefijos guardado como arreglos planos de enteros de 32 bits, que
+# se leen directamente del archivo mapeado en memoria sin volver a leer el corpus.
+# Los nodos se numeran por niveles (la raíz es el 0) y las palabras por relevancia.
+# Secciones después de la cabecera, en este orden:
+#   inicio_hijos  [nodos + 1]        Posición del primer hijo de cada nodo en hijos_*
+#   hijos_char    [hijos]            Código del carácter de cada hijo (ordenados por nodo)
+#   hijos_nodo    [hijos]            Nodo hijo
+#   palabra_nodo  [nodos]            Palabra que termina en el nodo o -1
+#   mejores       [nodos * (k + 1)]  Mejores palabras de cada nodo, completado con -1
+#   frecuencia    [palabras]
+#   inicio_texto  [palabras + 1]     Posición de cada palabra en el texto UTF-8
+#   texto         [bytes]
+# La cabecera guarda el tamaño y la fecha de modificación del corpus y los parámetros
+# con los que se construyó; si alguno cambia, el índice se reconstruye
+MAGICO = b"VOCIDX01"
+CABECERA = struct.Struct("<8sqq7i")   # mágico, tamaño, mtime_ns, min_len, max_len, max_k, palabras, nodos, hijos, bytes de texto
+
+
+class IndiceCompilado:
+    def __init__(self, datos):
+        (_, _, _, _, _, self.max_k, n_palabras, n_nodos, n_hijos,
+         tam_texto) = CABECERA.unpack_from(datos)
+        self._datos = datos        # Se conserva el mapeo mientras existan las vistas
+        vista = memoryview(datos)
+        pos = CABECERA.size
+
+        def seccion(n):
+            nonlocal pos
+            inicio, pos = pos, pos + 4 * n
+            return vista[inicio:pos].cast("i")
+
+        self.inicio_hijos = seccion(n_nodos + 1)
+        self.hijos_char = seccion(n_hijos)
+        self.hijos_nodo = seccion(n_hijos)
+        self.palabra_nodo = seccion(n_nodos)
+        self.mejores = seccion(n_nodos * (self.max_k + 1))
+        self.frecuencia = seccion(n_palabras)
+        self.inicio_texto = seccion(n_palabras + 1)
+        self.texto = vista[pos:pos + tam_texto]
+        self.n_palabras = n_palabras
+        self._frecuencias = None
+
+    # Tamaño esperado del archivo según la cabecera (para detectar archivos truncados)
+    @staticmethod
+    def tamano(cabecera):
+        _, _, _, _, _, max_k, n_palabras, n_nodos, n_hijos, tam_texto = cabecera
+        enteros = (n_nodos + 1) + 2 * n_hijos + n_nodos + n_nodos * (max_k + 1) + n_palabras + (n_palabras + 1)
+        return CABECERA.size + 4 * enteros + tam_texto
+
+    def _palabra(self, i):
+        return str(self.texto[self.inicio_texto[i]:self.inicio_texto[i + 1]], "utf-8")
+
+    # --- Nodo del prefijo o -1 si ninguna palabra empieza así ---
+    def _nodo(self, prefijo):
+        nodo = 0
+        for c in prefijo:
+            codigo = ord(c)
+            fin = self.inicio_hijos[nodo + 1]
+            j = bisect_left(self.hijos_char, codigo, self.inicio_hijos[nodo], fin)
+            if j == fin or self.hijos_char[j] != codigo:
+                return -1
+            nodo = self.hijos_nodo[j]
+        return nodo
+
+    # Diccionario palabra -> frecuencia, construido solo si se consulta
+    @property
+    def frecuencias(self):
+        if self._frecuencias is None:
+            self._frecuencias = {self._palabra(i): self.frecuencia[i] for i in range(self.n_palabras)}
+        return self._frecuencias
+
+    def __len__(self):
+        return self.n_palabras
+
+    def __contains__(self, palabra):
+        nodo = self._nodo(palabra)
+        return nodo >= 0 and self.palabra_nodo[nodo] >= 0
+
+    # --- Mismo resultado que IndicePrefijos.completar ---
+    def completar(self, prefijo, k=1):
+        if k > self.max_k:
+            raise ValueError(f"k={k} supera max_k={self.max_k}; construir el índice con un max_k mayor")
+        nodo = self._nodo(prefijo)
+        if nodo < 0:
+            return []
+        inicio = nodo * (self.max_k + 1)
+        posibles = []
+        for i in self.mejores[inicio:inicio + self.max_k + 1]:
+            if i < 0:
+                break
+            palabra = self._palabra(i)
+            if palabra != prefijo:
+                posibles.append(palabra)
+        return posibles[:k]
+
+
+# --- Guardar un IndicePrefijos como índice compilado ---
+# clave = (tamaño del corpus, mtime_ns, min_len, max_len). Se escribe en un archivo
+# temporal y se reemplaza al final, así nunca se lee un índice a medio escribir
+def guardar_indice(indice, path, clave):
+    palabras = sorted(indice.frecuencias.items(), key=IndicePrefijos._clave)
+    ids = {p: i for i, (p, _) in enumerate(palabras)}
+
+    # Numerar los nodos por niveles; los hijos de cada nodo quedan contiguos y ordenados
+    nodos = [indice.raiz]
+    inicio_hijos, hijos_char, hijos_nodo = array("i"), array("i"), array("i")
+    cola = deque([(indice.raiz, "")])
+    palabra_nodo = array("i")
+    mejores = array("i")
+    limite = indice.max_k + 1
+    while cola:
+        nodo, prefijo = cola.popleft()
+        inicio_hijos.append(len(hijos_char))
+        for c in sorted(nodo.hijos):
+            hijos_char.append(ord(c))
+            hijos_nodo.append(len(nodos))
+            nodos.append(nodo.hijos[c])
+            cola.append((nodo.hijos[c], prefijo + c))
+        palabra_nodo.append(ids.get(prefijo, -1))
+        mejor = [ids[p] for p, _ in nodo.mejores]
+        mejores.extend(mejor + [-1] * (limite - len(mejor)))
+    inicio_hijos.append(len(hijos_char))
+
+    frecuencia, inicio_texto, texto = array("i"), array("i"), bytearray()
+    for p, f in palabras:
+        frecuencia.append(f)
+        inicio_texto.append(len(texto))
+        texto += p.encode("utf-8")
+    inicio_texto.append(len(texto))
+
+    tam, mtime_ns, min_len, max_len = clave
+    cabecera = CABECERA.pack(MAGICO, tam, mtime_ns, min_len, max_len, indice.max_k,
+                             len(palabras), len(nodos), len(hijos_char), len(texto))
+    directorio = os.path.dirname(path)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = path + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(cabecera)
+        for seccion in (inicio_hijos, hijos_char, hijos_nodo, palabra_nodo, mejores, frecuencia, inicio_texto):
+            seccion.tofile(f)
+        f.write(texto)
+    os.replace(temporal, path)
+
+
+# --- Abrir un índice compilado si existe y corresponde al corpus y parámetros ---
+# Devuelve None si falta, está desactualizado o dañado
+def abrir_indice(path, clave, max_k):
+    try:
+        with open(path, "rb") as f:
+            datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(datos) >= CABECERA.size:
+        cabecera = CABECERA.unpack_from(datos)
+        if (cabecera[0] == MAGICO and cabecera[1:5] == clave and cabecera[5] == max_k
+                and len(datos) == IndiceCompilado.tamano(cabecera)):
+            return IndiceCompilado(datos)
+    datos.close()
+    return None
+
+
+# --- Contar la frecuencia de cada palabra del corpus ---
+def contar_palabras(path, min_len=3, max_len=15):
+    frecuencias = Counter()  # Contador para registrar cuántas veces aparece cada palabra
+    with open(path, "r", encoding="utf-8") as f:
+        for linea in f:
+            # Extraemos palabras que contengan solo letras y caracteres especiales del español
+            for p in patron_palabra.findall(linea.lower()):
+                # Solo contamos palabras que estén dentro del rango de longitud permitido
+                if min_len <= len(p) <= max_len:
+                    frecuencias[p] += 1
+    return frecuencias
+
+
+# --- Función para cargar vocabulario desde un archivo de texto ---
+# Usa el índice compilado (path_indice) si el corpus no cambió desde que se generó;
+# si no, cuenta la frecuencia de cada palabra del corpus, construye el índice de
+# prefijos y lo compila para el próximo arranque. Con path_indice=None no usa caché.
+# max_k es el máximo de sugerencias por prefijo: completar(prefijo, k) con k > max_k
+# lanza ValueError, así que quien necesite más sugerencias debe subirlo aquí
+def cargar_vocabulario(path="spanish_corpus.txt", min_len=3, max_len=15, max_k=5,
+                       path_indice="model/vocabulario.idx"):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        print(f"Archivo {path} no encontrado. Usando vocabulario vacío.")
+        return IndicePrefijos({}, max_k=max_k)
+    clave = (st.st_size, st.st_mtime_ns, min_len, max_len)
+    if path_indice:
+        indice = abrir_indice(path_indice, clave, max_k)
+        if indice is not None:
+            return indice
+
+    indice = IndicePrefijos(contar_palabras(path, min_len, max_len), max_k=max_k)
+    if path_indice:
+        try:
+            guardar_indice(indice, path_indice, clave)
+        except OSError as e:
+            print(f"No se pudo guardar el índice compilado en {path_indice} ({e}).")
+    return indice